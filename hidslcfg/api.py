@@ -1,19 +1,33 @@
 """Web API client."""
 
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, suppress
 from enum import Enum
-from typing import Callable
-from urllib.parse import urljoin
-
-from requests import ConnectionError as ConnErr, Response, Session
-
+from json import dumps, loads
+from os import O_CREAT, O_TRUNC, O_WRONLY, fdopen, getenv, open as os_open, replace
+from pathlib import Path
+from time import time
+from typing import Callable, Iterator
+from urllib.parse import urljoin, urlparse
+
+from requests import ConnectionError as ConnErr, RequestException, Response
+from requests import Session, Timeout
+
+from hidslcfg.cancel import CancellationToken
+from hidslcfg.common import LOGGER
 from hidslcfg.exceptions import APIError, ProgramError
+from hidslcfg.trace import span
 
 
-__all__ = ["Client"]
+__all__ = ["SESSION_FILE", "Client"]
 
 
-LOGIN_URL = "https://his.homeinfo.de/session"
-SETUP_URL_BASE = "https://termgr.homeinfo.de/setup/"
+LOGIN_URL = getenv("HIDSL_LOGIN_URL", "https://his.homeinfo.de/session")
+SETUP_URL_BASE = getenv("HIDSL_SETUP_URL_BASE", "https://termgr.homeinfo.de/setup/")
+TIMEOUT = (10, 60)  # connect and read timeouts in seconds
+SESSION_FILE = Path("/run/hidslcfg/session.json")
+SESSION_LIFETIME = 3600  # seconds, unless the cookies expire themselves
+UNAUTHORIZED = 401
 
 
 class HTTPMethod(Enum):
@@ -26,9 +40,25 @@ class HTTPMethod(Enum):
 class Client:
     """Class to retrieve data from the web API."""
 
-    def __init__(self):
-        """Initialize with credentials."""
+    def __init__(
+        self,
+        *,
+        timeout: float | tuple[float, float] = TIMEOUT,
+        login_url: str = LOGIN_URL,
+        setup_url_base: str = SETUP_URL_BASE,
+        session_file: Path | None = None,
+    ):
+        """Initialize with credentials.
+
+        If a session file is given, the session is persisted to it.
+        """
         self.session = Session()
+        self.timeout = timeout
+        self.login_url = login_url
+        self.setup_url_base = setup_url_base
+        self.session_file = session_file
+        self.token: CancellationToken | None = None
+        self.credentials: Callable[[], tuple[str, str]] | None = None
 
     def __enter__(self):
         if self.session is None:
@@ -47,6 +77,52 @@ class Client:
             print()
             raise ProgramError("Setup aborted by user.")
 
+    @contextmanager
+    def cancellable(self, token: CancellationToken) -> Iterator[None]:
+        """Make requests cancellable by the given token.
+
+        Cancellation closes the pooled connections, but cannot revoke a
+        request that has already been sent. Such requests are logged once
+        they complete, so that e.g. a registered system can be reconciled.
+        """
+        self.token = token
+        token.on_cancel(self.session.close)
+
+        try:
+            yield
+        finally:
+            self.token = None
+
+    def prewarm(self) -> None:
+        """Open pooled connections to the API servers.
+
+        This resolves the host names and performs the TLS handshakes
+        ahead of the first actual request. Errors are ignored.
+        """
+        origins = {
+            f"{(url := urlparse(base)).scheme}://{url.netloc}/"
+            for base in (self.login_url, self.setup_url_base)
+        }
+
+        with ThreadPoolExecutor(max_workers=len(origins)) as executor:
+            executor.map(self.connect, origins)
+
+    def connect(self, origin: str) -> bool:
+        """Open a pooled connection to the origin and return whether it worked."""
+        try:
+            with span(f"connect {origin}"):
+                self.session.head(origin, timeout=self.timeout, allow_redirects=False)
+        except RequestException as error:
+            LOGGER.debug("Could not connect to %s: %s", origin, error)
+            return False
+
+        return True
+
+    def reachable(self) -> bool:
+        """Determine whether the setup API accepts connections."""
+        url = urlparse(self.setup_url_base)
+        return self.connect(f"{url.scheme}://{url.netloc}/")
+
     def get_http_method(self, method: HTTPMethod) -> Callable:
         """Returns the requested HTTP method to call."""
         if method is HTTPMethod.POST:
@@ -58,11 +134,63 @@ class Client:
         raise NotImplementedError(f"HTTP method {method} is not implemented.")
 
     def request(self, method: HTTPMethod, url: str, json: dict) -> Response:
-        """Make a request."""
+        """Make a request, logging in again if the session expired."""
+        try:
+            return self.send(method, url, json)
+        except APIError as error:
+            if error.status != UNAUTHORIZED or url == self.login_url:
+                raise
+
+            self.discard_session()
+
+            if self.credentials is None:
+                raise
+
+        LOGGER.info("Session expired, logging in again.")
+        self.login(*self.credentials())
+        return self.send(method, url, json)
+
+    def send(self, method: HTTPMethod, url: str, json: dict) -> Response:
+        """Make a cancellable request."""
+        if (token := self.token) is None:
+            return self._request(method, url, json)
+
+        # Return immediately on cancellation and discard the pending response.
+        return token.run(self._request_cancellable, token, method, url, json)
+
+    def _request_cancellable(
+        self, token: CancellationToken, method: HTTPMethod, url: str, json: dict
+    ) -> Response:
+        """Make a blocking request and log it if it completes after cancellation."""
+        try:
+            response = self._request(method, url, json)
+        except APIError as error:
+            if token.cancelled:
+                LOGGER.info("Cancelled %s %s failed: %s", method.value, url, error)
+
+            raise
+
+        if token.cancelled:
+            LOGGER.warning(
+                "Cancelled %s %s took effect nonetheless: %s",
+                method.value,
+                url,
+                response.text,
+            )
+
+        return response
+
+    def _request(self, method: HTTPMethod, url: str, json: dict) -> Response:
+        """Make a blocking request."""
         try:
-            response = self.get_http_method(method)(url, json=json)
+            with span(f"{method.value} {urlparse(url).path}", url=url):
+                response = self.get_http_method(method)(
+                    url, json=json, timeout=self.timeout
+                )
         except ConnErr:
             raise APIError("Connection error.") from None
+        except Timeout:
+            raise APIError("Request timed out.") from None
 
         if response.status_code != 200:
             raise APIError.from_response(response)
@@ -79,11 +207,99 @@ class Client:
 
     def login(self, account: str, passwd: str) -> Response:
         """Performs a HIS login."""
-        return self.post(LOGIN_URL, {"account": account, "passwd": passwd})
+        response = self.post(self.login_url, {"account": account, "passwd": passwd})
+        self.save_session()
+        return response
+
+    def authenticate(self, credentials: Callable[[], tuple[str, str]]) -> None:
+        """Log in unless a persisted session is still valid.
+
+        The credentials are only requested if a login is required.
+        """
+        self.credentials = credentials
+
+        if not self.restore_session():
+            self.login(*credentials())
+
+    def save_session(self) -> None:
+        """Persist the session's cookies."""
+        if self.session_file is None:
+            return
+
+        cookies = [
+            {
+                "name": cookie.name,
+                "value": cookie.value,
+                "domain": cookie.domain,
+                "path": cookie.path,
+                "secure": cookie.secure,
+                "expires": cookie.expires,
+            }
+            for cookie in self.session.cookies
+        ]
+        expires = min(
+            (cookie["expires"] for cookie in cookies if cookie["expires"]),
+            default=time() + SESSION_LIFETIME,
+        )
+        tmp = self.session_file.with_name(f".{self.session_file.name}")
+
+        try:
+            self.session_file.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+
+            with fdopen(
+                os_open(tmp, O_WRONLY | O_CREAT | O_TRUNC, 0o600), "w"
+            ) as file:
+                file.write(dumps({"expires": expires, "cookies": cookies}))
+
+            replace(tmp, self.session_file)
+        except OSError as error:
+            LOGGER.warning("Could not persist session: %s", error)
+
+    def restore_session(self) -> bool:
+        """Restore a persisted session and return whether it is valid."""
+        if self.session_file is None:
+            return False
+
+        try:
+            session = loads(self.session_file.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return False
+        except ValueError:
+            LOGGER.warning("Discarding malformed persisted session.")
+            self.discard_session()
+            return False
+
+        try:
+            if session["expires"] <= time():
+                LOGGER.debug("Persisted session expired.")
+                self.discard_session()
+                return False
+
+            for cookie in session["cookies"]:
+                self.session.cookies.set(**cookie)
+        except (KeyError, TypeError, ValueError):
+            LOGGER.warning("Discarding malformed persisted session.")
+            self.discard_session()
+            return False
+
+        LOGGER.debug("Restored persisted session.")
+        return True
+
+    def discard_session(self) -> None:
+        """Discard the session and its persisted copy."""
+        self.session.cookies.clear()
+
+        if self.session_file is not None:
+            with suppress(FileNotFoundError):
+                self.session_file.unlink()
+
+    def authorize(self, token: str) -> None:
+        """Authorizes subsequent requests with a provisioning token."""
+        self.session.headers["Authorization"] = f"Bearer {token}"
 
     def post_endpoint(self, endpoint: str, **json) -> Response:
         """Makes a POST request to the respective endpoint."""
-        return self.post(urljoin(SETUP_URL_BASE, endpoint), json)
+        return self.post(urljoin(self.setup_url_base, endpoint), json)
 
     def info(self, system: int) -> dict:
         """Returns the terminal information."""
@@ -95,8 +311,8 @@ class Client:
 
     def add_system(self, **json) -> dict:
         """Adds a new WireGuard system."""
-        return self.post(urljoin(SETUP_URL_BASE, "system"), json).json()
+        return self.post(urljoin(self.setup_url_base, "system"), json).json()
 
     def patch_system(self, **json) -> dict:
         """Patches an existing WireGuard system."""
-        return self.patch(urljoin(SETUP_URL_BASE, "system"), json).json()
+        return self.patch(urljoin(self.setup_url_base, "system"), json).json()
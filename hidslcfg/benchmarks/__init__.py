@@ -0,0 +1 @@
+"""Benchmarks for regression testing of performance critical code."""
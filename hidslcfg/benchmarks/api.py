@@ -0,0 +1,155 @@
+"""Load generator for the web API.
+
+Drives the web API client with concurrent sessions and reports the
+throughput and latency percentiles per operation. Since each session
+creates systems, the bundled mock server is used unless the production
+API is explicitly requested.
+"""
+
+from __future__ import annotations
+from argparse import ArgumentParser, Namespace
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from statistics import quantiles
+from time import perf_counter
+from typing import Any, Callable, Iterator
+
+from hidslcfg.api import LOGIN_URL, SETUP_URL_BASE, Client
+from hidslcfg.exceptions import APIError
+from hidslcfg.termio import Table
+
+
+__all__ = ["run"]
+
+
+MOCK_SERVER = "http://127.0.0.1:8080/"
+PARSER = ArgumentParser(description=__doc__)
+PARSER.add_argument(
+    "-c", "--sessions", type=int, default=10, metavar="n", help="concurrent sessions"
+)
+PARSER.add_argument(
+    "-n",
+    "--systems",
+    type=int,
+    default=10,
+    metavar="n",
+    help="systems to create and patch per session",
+)
+PARSER.add_argument("-u", "--user", default="loadtest", help="user name")
+PARSER.add_argument("-p", "--passwd", default="loadtest", help="password")
+PARSER.add_argument(
+    "--login-url", metavar="url", help="login URL (mock server by default)"
+)
+PARSER.add_argument(
+    "--setup-url-base", metavar="url", help="setup URL (mock server by default)"
+)
+PARSER.add_argument(
+    "--production",
+    action="store_true",
+    help="use the production API, which creates real systems",
+)
+
+
+@dataclass(frozen=True)
+class Sample:
+    """A timed request."""
+
+    operation: str
+    latency: float
+    error: str | None = None
+
+
+def timed(samples: list[Sample], operation: str, function: Callable[[], Any]) -> Any:
+    """Time the function and record the sample."""
+
+    start = perf_counter()
+
+    try:
+        result = function()
+    except APIError as error:
+        samples.append(Sample(operation, perf_counter() - start, str(error)))
+        return None
+
+    samples.append(Sample(operation, perf_counter() - start))
+    return result
+
+
+def session(args: Namespace) -> list[Sample]:
+    """Run a client session."""
+
+    client = Client(login_url=args.login_url, setup_url_base=args.setup_url_base)
+    samples: list[Sample] = []
+
+    if timed(samples, "login", lambda: client.login(args.user, args.passwd)) is None:
+        return samples
+
+    for _ in range(args.systems):
+        system = timed(
+            samples,
+            "add_system",
+            lambda: client.add_system(os="Arch Linux", model="Load test", pubkey=""),
+        )
+
+        if system is None:
+            continue
+
+        timed(
+            samples,
+            "patch_system",
+            lambda: client.patch_system(system=system["id"], pubkey=""),
+        )
+        timed(samples, "info", lambda: client.info(system["id"]))
+
+    return samples
+
+
+def percentiles(latencies: list[float]) -> str:
+    """Format the 50th, 95th and 99th percentile of the latencies in ms."""
+
+    if len(latencies) < 2:
+        values = latencies * 3
+    else:
+        cut_points = quantiles(latencies, n=100, method="inclusive")
+        values = [cut_points[49], cut_points[94], cut_points[98]]
+
+    return " / ".join(f"{value * 1000:.1f}" for value in values)
+
+
+def rows(samples: list[Sample], duration: float) -> Iterator[tuple[str, str]]:
+    """Yield table rows of the results."""
+
+    yield "Metric", "Value"
+    yield "Requests", str(len(samples))
+    yield "Errors", str(sum(sample.error is not None for sample in samples))
+    yield "Duration", f"{duration:.2f} s"
+    yield "Throughput", f"{len(samples) / duration:.1f} req/s"
+    operations: dict[str, list[float]] = {}
+
+    for sample in samples:
+        if sample.error is None:
+            operations.setdefault(sample.operation, []).append(sample.latency)
+
+    for operation, latencies in operations.items():
+        yield f"{operation} p50 / p95 / p99", f"{percentiles(latencies)} ms"
+
+
+def run() -> None:
+    """Run the load generator."""
+
+    args = PARSER.parse_args()
+
+    if args.login_url is None:
+        args.login_url = LOGIN_URL if args.production else f"{MOCK_SERVER}session"
+
+    if args.setup_url_base is None:
+        args.setup_url_base = (
+            SETUP_URL_BASE if args.production else f"{MOCK_SERVER}setup/"
+        )
+
+    start = perf_counter()
+
+    with ThreadPoolExecutor(max_workers=args.sessions) as executor:
+        futures = [executor.submit(session, args) for _ in range(args.sessions)]
+        samples = [sample for future in futures for sample in future.result()]
+
+    print(Table.generate(rows(samples, perf_counter() - start)))
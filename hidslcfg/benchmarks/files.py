@@ -0,0 +1,298 @@
+"""Benchmarks of the parsers and file operations.
+
+Synthetic fixtures of realistic and extreme sizes are generated in a
+temporary directory and the modules' path constants are redirected to them.
+"""
+
+from __future__ import annotations
+from argparse import ArgumentParser, Namespace
+from contextlib import contextmanager
+from dataclasses import dataclass
+from ipaddress import IPv6Address, ip_address
+from json import dumps
+from os import getgid, getuid
+from pathlib import Path
+from statistics import median
+from tempfile import TemporaryDirectory
+from time import perf_counter, time
+from tracemalloc import get_traced_memory, start, stop
+from types import ModuleType
+from typing import Any, Callable, ContextManager, Iterator
+
+from hidslcfg import cpuinfo, hosts, pacman, wifi
+from hidslcfg.system import chown, rmsubtree
+from hidslcfg.termio import Table
+
+
+__all__ = ["run"]
+
+
+SERVER = IPv6Address("fd56:1dda:8794:cb90:ffff:ffff:ffff:fffe")
+SIZES = ("realistic", "extreme")
+PARSER = ArgumentParser(description=__doc__)
+PARSER.add_argument(
+    "-s", "--size", choices=SIZES, action="append", help="fixture sizes to run"
+)
+PARSER.add_argument(
+    "-r", "--rounds", type=int, default=5, metavar="n", help="timed rounds"
+)
+PARSER.add_argument("-k", "--keyword", metavar="name", help="only run matching")
+PARSER.add_argument(
+    "-l", "--label", metavar="label", help="label of the results, e.g. commit"
+)
+PARSER.add_argument(
+    "-o", "--output", type=Path, metavar="file", help="append JSON lines results"
+)
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    """A benchmarked operation."""
+
+    name: str
+    fixture: Callable[[Path, int], ContextManager]
+    function: Callable[[], Any]
+    sizes: dict[str, int]
+    destructive: bool = False
+
+
+@contextmanager
+def redirect(module: ModuleType, name: str, value: Any) -> Iterator[None]:
+    """Temporarily set a module's global variable."""
+
+    original = getattr(module, name)
+    setattr(module, name, value)
+
+    try:
+        yield
+    finally:
+        setattr(module, name, original)
+
+
+def hosts_fixture(directory: Path, lines: int) -> ContextManager:
+    """Generate a hosts file with the given amount of entries."""
+
+    path = directory / "hosts"
+
+    with path.open("w", encoding="ascii") as file:
+        file.write("# Static table lookup for hostnames.\n\n")
+        file.write("127.0.0.1\tlocalhost\n::1\tlocalhost\n")
+        file.write(f"{SERVER}\tappcmd.homeinfo.intra\tappcmd\n")
+
+        for index in range(lines):
+            file.write(f"{ip_address(0x0A000000 + index)}\thost{index}.lan\n")
+
+    return redirect(hosts, "HOSTS", path)
+
+
+def pacman_fixture(directory: Path, repos: int) -> ContextManager:
+    """Generate a pacman.conf with the given amount of repositories."""
+
+    path = directory / "pacman.conf"
+
+    with path.open("w", encoding="ascii") as file:
+        file.write("[options]\nHoldPkg = pacman glibc\nArchitecture = auto\n\n")
+        file.write("[homeinfo]\nSigLevel = Required\n")
+        file.write("Server = http://10.8.0.1:8080/$repo/$arch\n\n")
+
+        for index in range(repos):
+            file.write(f"[repo{index}]\nInclude = /etc/pacman.d/mirrorlist\n\n")
+
+    return redirect(pacman, "PACMAN_CONF", path)
+
+
+def wifi_fixture(directory: Path, interfaces: int) -> ContextManager:
+    """Generate wpa_supplicant configurations for the amount of interfaces."""
+
+    for index in range(interfaces):
+        name = wifi.CONFIG_FILE_TEMPLATE.format(interface=f"wlp{index}s0")
+
+        with (directory / name).open("w", encoding="utf-8") as file:
+            file.write(
+                "network={\n"
+                f'\tssid="network{index}"\n'
+                f'\t#psk="passphrase{index}"\n'
+                f"\tpsk={index:064x}\n"
+                "}\n"
+            )
+
+    return redirect(wifi, "CONFIG_DIR", directory)
+
+
+def cpuinfo_fixture(directory: Path, cores: int) -> ContextManager:
+    """Generate a /proc/cpuinfo with the given amount of cores."""
+
+    path = directory / "cpuinfo"
+    flags = " ".join(f"flag{index}" for index in range(120))
+
+    with path.open("w", encoding="ascii") as file:
+        for core in range(cores):
+            file.write(
+                f"processor\t: {core}\n"
+                "vendor_id\t: GenuineIntel\n"
+                "cpu family\t: 6\n"
+                "model name\t: Intel(R) Celeron(R) J4125 CPU @ 2.00GHz\n"
+                "cpu MHz\t\t: 1995.312\n"
+                f"core id\t\t: {core}\n"
+                f"flags\t\t: {flags}\n"
+                "bugs\t\t: spectre_v1 spectre_v2\n"
+                "bogomips\t: 3993.60\n\n"
+            )
+
+    return redirect(cpuinfo, "CPUINFO", path)
+
+
+def tree_fixture(directory: Path, files: int) -> Path:
+    """Generate a digital signage data tree with the given amount of files."""
+
+    root = directory / "digsig"
+    per_directory = 100
+
+    for index in range(files):
+        subdirectory = root / f"{index // per_directory:04d}"
+
+        if index % per_directory == 0:
+            subdirectory.mkdir(parents=True, exist_ok=True)
+
+        (subdirectory / f"{index:06d}.bin").write_bytes(b"\0" * 64)
+
+    return root
+
+
+BENCHMARKS = [
+    Benchmark(
+        "hosts.read_hosts",
+        hosts_fixture,
+        lambda: list(hosts.read_hosts()),
+        {"realistic": 20, "extreme": 10_000},
+    ),
+    Benchmark(
+        "hosts.set_ip",
+        hosts_fixture,
+        lambda: hosts.set_ip("appcmd.homeinfo.intra", SERVER),
+        {"realistic": 20, "extreme": 10_000},
+    ),
+    Benchmark(
+        "pacman.set_server",
+        pacman_fixture,
+        lambda: pacman.set_server("homeinfo", SERVER),
+        {"realistic": 5, "extreme": 2_500},
+    ),
+    Benchmark(
+        "wifi.load_wifi_configs",
+        wifi_fixture,
+        wifi.load_wifi_configs,
+        {"realistic": 2, "extreme": 1_000},
+    ),
+    Benchmark(
+        "cpuinfo.cpuinfo",
+        cpuinfo_fixture,
+        lambda: list(cpuinfo.cpuinfo()),
+        {"realistic": 4, "extreme": 64},
+    ),
+]
+TREE_SIZES = {"realistic": 1_000, "extreme": 100_000}
+
+
+def measure(function: Callable[[], Any], prepare: Callable[[], Any]) -> float:
+    """Measure the run time of the function after preparation."""
+
+    prepare()
+    start_time = perf_counter()
+    function()
+    return perf_counter() - start_time
+
+
+def measure_memory(function: Callable[[], Any], prepare: Callable[[], Any]) -> int:
+    """Measure the peak memory allocated by the function after preparation."""
+
+    prepare()
+    start()
+
+    try:
+        function()
+        _, peak = get_traced_memory()
+    finally:
+        stop()
+
+    return peak
+
+
+def benchmark(
+    function: Callable[[], Any], rounds: int, prepare: Callable[[], Any] = lambda: None
+) -> dict[str, Any]:
+    """Benchmark the function."""
+
+    times = [measure(function, prepare) for _ in range(rounds)]
+    return {
+        "min": min(times),
+        "median": median(times),
+        "peak_memory": measure_memory(function, prepare),
+    }
+
+
+def run_file_benchmarks(args: Namespace, size: str) -> Iterator[tuple[str, dict]]:
+    """Run the parser benchmarks for the given fixture size."""
+
+    for bench in BENCHMARKS:
+        if args.keyword and args.keyword not in bench.name:
+            continue
+
+        with TemporaryDirectory() as tmpd:
+            with bench.fixture(Path(tmpd), bench.sizes[size]):
+                yield bench.name, benchmark(bench.function, args.rounds)
+
+
+def run_tree_benchmarks(args: Namespace, size: str) -> Iterator[tuple[str, dict]]:
+    """Run the digital signage data tree benchmarks for the given size."""
+
+    files = TREE_SIZES[size]
+
+    with TemporaryDirectory() as tmpd:
+        tree = tree_fixture(Path(tmpd), files)
+
+        if not args.keyword or args.keyword in "system.chown":
+            yield "system.chown", benchmark(
+                lambda: chown(tree, getuid(), getgid(), recursive=True), args.rounds
+            )
+
+        if not args.keyword or args.keyword in "system.rmsubtree":
+            yield "system.rmsubtree", benchmark(
+                lambda: rmsubtree(tree),
+                args.rounds,
+                lambda: tree_fixture(Path(tmpd), files),
+            )
+
+
+def rows(results: list[dict[str, Any]]) -> Iterator[tuple[str, str]]:
+    """Yield table rows of the results."""
+
+    yield "Operation", "Median time / peak memory"
+
+    for result in results:
+        yield (
+            f'{result["name"]} ({result["size"]})',
+            f'{result["median"] * 1000:.2f} ms / {result["peak_memory"] / 1024:.0f} KiB',
+        )
+
+
+def run() -> None:
+    """Run the benchmarks."""
+
+    args = PARSER.parse_args()
+    results = []
+
+    for size in args.size or SIZES:
+        for name, result in [
+            *run_file_benchmarks(args, size),
+            *run_tree_benchmarks(args, size),
+        ]:
+            results.append({"name": name, "size": size, **result})
+
+    print(Table.generate(rows(results)))
+
+    if args.output is not None:
+        with args.output.open("a", encoding="utf-8") as file:
+            for result in results:
+                record = {"label": args.label, "timestamp": time(), **result}
+                file.write(dumps(record) + "\n")
@@ -0,0 +1,255 @@
+"""Headless benchmark of the GUI's startup and window transitions.
+
+Runs the GUI on a Broadway display with stubbed web API and system
+commands and drives it from login to the completed window.
+"""
+
+from __future__ import annotations
+from argparse import ArgumentParser, Namespace
+from json import dump
+from os import environ, getenv
+from pathlib import Path
+from resource import RUSAGE_SELF, getrusage
+from subprocess import DEVNULL, CompletedProcess, Popen
+from time import perf_counter, sleep
+from typing import Any, Iterator
+
+from hidslcfg.termio import Table
+
+
+__all__ = ["run"]
+
+
+BROADWAYD = Path("/usr/bin/broadwayd")
+SOCKET_TIMEOUT = 5  # seconds
+PARSER = ArgumentParser(description=__doc__)
+PARSER.add_argument(
+    "-b", "--broadwayd", type=Path, default=BROADWAYD, help="the broadway daemon"
+)
+PARSER.add_argument(
+    "-d", "--display", type=int, default=5, metavar="n", help="broadway display"
+)
+PARSER.add_argument(
+    "-t",
+    "--timeout",
+    type=float,
+    default=60,
+    metavar="seconds",
+    help="abort the benchmark after this time",
+)
+PARSER.add_argument(
+    "-F",
+    "--max-first-frame",
+    type=float,
+    metavar="seconds",
+    help="fail if the first frame takes longer",
+)
+PARSER.add_argument(
+    "-T",
+    "--max-transition",
+    type=float,
+    metavar="seconds",
+    help="fail if any window transition takes longer",
+)
+PARSER.add_argument("-j", "--json", type=Path, metavar="file", help="JSON output")
+
+
+class Recorder:
+    """Drives the GUI and records timings."""
+
+    def __init__(self, start: float):
+        self.start = start
+        self.first_frame: float | None = None
+        self.transitions: dict[str, float] = {}
+        self.trigger: tuple[str, float] | None = None
+        self.error: str | None = None
+
+    def triggered(self, name: str) -> None:
+        """Record the start of a window transition."""
+        self.trigger = (name, perf_counter())
+
+    def on_frame(self, window: Any) -> bool:
+        """Record the first frame of the window and continue the flow."""
+        from hidslcfg.gui.api import GLib, Gtk
+
+        now = perf_counter()
+
+        if self.first_frame is None:
+            self.first_frame = now - self.start
+        elif self.trigger is not None:
+            name, start = self.trigger
+            self.transitions[f"{name} → {type(window).__name__}"] = now - start
+
+        if next_step := getattr(self, f"on_{type(window).__name__}", None):
+            next_step(window)
+        else:
+            Gtk.main_quit()
+
+        return GLib.SOURCE_REMOVE
+
+    def on_MainWindow(self, window: Any) -> None:
+        """Log in."""
+        window.login_tab.user_name.set_text("benchmark")
+        window.login_tab.password.set_text("benchmark")
+        self.triggered(type(window).__name__)
+        window.login_tab.login.clicked()
+
+    def on_SetupForm(self, window: Any) -> None:
+        """Start the installation."""
+        self.triggered(type(window).__name__)
+        window.install.clicked()
+
+    def on_InstallationForm(self, window: Any) -> None:
+        """The installation starts on its own."""
+        self.triggered(type(window).__name__)
+
+    def on_timeout(self) -> bool:
+        """Abort the benchmark."""
+        from hidslcfg.gui.api import GLib, Gtk
+
+        self.error = "Benchmark timed out."
+        Gtk.main_quit()
+        return GLib.SOURCE_REMOVE
+
+    def results(self) -> dict[str, Any]:
+        """Return the benchmark results."""
+        return {
+            "first_frame": self.first_frame,
+            "transitions": self.transitions,
+            "peak_rss_kib": getrusage(RUSAGE_SELF).ru_maxrss,
+            "error": self.error,
+        }
+
+
+def start_broadwayd(broadwayd: Path, display: int) -> Popen:
+    """Start the broadway daemon and wait for its socket."""
+
+    process = Popen([str(broadwayd), f":{display}"], stdout=DEVNULL, stderr=DEVNULL)
+    runtime_dir = Path(getenv("XDG_RUNTIME_DIR", "/tmp"))
+    socket = runtime_dir / f"broadway{display + 1}.socket"
+    deadline = perf_counter() + SOCKET_TIMEOUT
+
+    while not socket.exists() and perf_counter() < deadline:
+        sleep(0.01)
+
+    return process
+
+
+def stub_system(*args: Any) -> CompletedProcess:
+    """Pretend to successfully invoke system commands."""
+
+    return CompletedProcess(tuple(map(str, args)), 0)
+
+
+def benchmark(args: Namespace, start: float) -> dict[str, Any]:
+    """Run the GUI and record the timings."""
+
+    # Import GUI modules only after the environment has been set up.
+    from requests import Response
+
+    from hidslcfg import system
+    from hidslcfg.api import Client
+    from hidslcfg.gui.api import BuilderWindow, GLib, Gtk, SetupParameters
+    from hidslcfg.gui.application import create_windows
+    from hidslcfg.gui.windows import installation
+
+    class StubClient(Client):
+        """Client that does not contact the web API."""
+
+        def request(self, *_) -> Response:
+            """Return an empty successful response."""
+            response = Response()
+            response.status_code = 200
+            response._content = b"{}"
+            return response
+
+        def prewarm(self) -> None:
+            """Do not open any connections."""
+
+    system.system = stub_system
+    installation.SLEEP = 0
+    recorder = Recorder(start)
+    show = BuilderWindow.show
+
+    def show_and_record(window: BuilderWindow) -> None:
+        show(window)
+        GLib.idle_add(recorder.on_frame, window)
+
+    BuilderWindow.show = show_and_record
+    create_windows(StubClient(), SetupParameters()).show()
+    GLib.timeout_add(int(args.timeout * 1000), recorder.on_timeout)
+    Gtk.main()
+    return recorder.results()
+
+
+def rows(results: dict[str, Any]) -> Iterator[tuple[str, Any]]:
+    """Yield table rows of the results."""
+
+    yield "Metric", "Value"
+    yield "Time to first frame", format_seconds(results["first_frame"])
+
+    for transition, seconds in results["transitions"].items():
+        yield transition, format_seconds(seconds)
+
+    yield "Peak RSS", f'{results["peak_rss_kib"]} KiB'
+
+    if error := results["error"]:
+        yield "Error", error
+
+
+def format_seconds(seconds: float | None) -> str:
+    """Format seconds as milliseconds."""
+
+    if seconds is None:
+        return "-"
+
+    return f"{seconds * 1000:.1f} ms"
+
+
+def violations(args: Namespace, results: dict[str, Any]) -> Iterator[str]:
+    """Yield budget violations."""
+
+    if results["error"]:
+        yield results["error"]
+
+    if args.max_first_frame is not None and results["first_frame"] is not None:
+        if results["first_frame"] > args.max_first_frame:
+            yield "First frame exceeded budget."
+
+    if args.max_transition is not None:
+        for transition, seconds in results["transitions"].items():
+            if seconds > args.max_transition:
+                yield f"Transition {transition} exceeded budget."
+
+
+def main() -> int:
+    """Run the benchmark."""
+
+    args = PARSER.parse_args()
+    environ["GDK_BACKEND"] = "broadway"
+    environ["BROADWAY_DISPLAY"] = f":{args.display}"
+    environ["HIDSL_DEBUG"] = "1"
+    broadwayd = start_broadwayd(args.broadwayd, args.display)
+
+    try:
+        results = benchmark(args, perf_counter())
+    finally:
+        broadwayd.terminate()
+        broadwayd.wait()
+
+    print(Table.generate(rows(results)))
+
+    if args.json is not None:
+        with args.json.open("w", encoding="utf-8") as file:
+            dump(results, file, indent=2)
+
+    for violation in (failures := list(violations(args, results))):
+        print(violation)
+
+    return 1 if failures else 0
+
+
+def run() -> None:
+    """Run the benchmark and exit with its return code."""
+
+    raise SystemExit(main())
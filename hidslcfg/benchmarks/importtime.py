@@ -0,0 +1,154 @@
+"""Import time regression check of the entry points.
+
+Each entry point is loaded in a fresh interpreter with python -X importtime
+and must resolve to a callable. The median cumulative import time of its
+module is compared against the entry point's budget.
+"""
+
+from __future__ import annotations
+from argparse import ArgumentParser
+from json import dumps
+from pathlib import Path
+from statistics import median
+from subprocess import PIPE, run as run_process
+from sys import executable, exit
+from time import time
+from typing import Any, Iterable, Iterator
+
+from hidslcfg.termio import Table
+
+
+__all__ = ["BUDGETS", "import_time", "run"]
+
+
+# Budgets of the entry points in milliseconds.
+BUDGETS = {
+    "hidslcfg.startpage:create_ddbos_start": 50,
+    "hidslcfg.cli.hidsldoctor:run": 150,
+    "hidslcfg.cli.hidslreset:run": 150,
+    "hidslcfg.cli.hidslcfg:run": 250,
+    "hidslcfg.cli.hidslprovision:run": 250,
+    "hidslcfg.cli.hidslsync:run": 250,
+    "hidslcfg.cli.hidslztp:run": 250,
+    "hidslcfg.gui.application:run": 500,
+}
+LOADER = (
+    "import {module} as module\n"
+    "function = getattr(module, {name!r})\n"
+    "if not callable(function):\n"
+    "    raise ImportError(f'{{function!r}} is not callable')\n"
+)
+PARSER = ArgumentParser(description=__doc__)
+PARSER.add_argument(
+    "-r", "--rounds", type=int, default=5, metavar="n", help="timed rounds"
+)
+PARSER.add_argument("-k", "--keyword", metavar="name", help="only run matching")
+PARSER.add_argument(
+    "-f",
+    "--factor",
+    type=float,
+    default=1,
+    metavar="x",
+    help="scale the budgets, e.g. for slow machines",
+)
+PARSER.add_argument(
+    "-l", "--label", metavar="label", help="label of the results, e.g. commit"
+)
+PARSER.add_argument(
+    "-o", "--output", type=Path, metavar="file", help="append JSON lines results"
+)
+
+
+def parse(stderr: str, module: str) -> float:
+    """Return the cumulative import time of the module in milliseconds."""
+
+    for line in stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:"):
+            continue
+
+        _, cumulative, name = line.rsplit("|", 2)
+
+        if name.strip() == module:
+            return int(cumulative) / 1000
+
+    raise ValueError(f"Module {module} not in import time output.")
+
+
+def import_time(entry_point: str) -> float:
+    """Load the entry point in a fresh interpreter and return its import time."""
+
+    module, name = entry_point.split(":")
+    result = run_process(
+        [executable, "-X", "importtime", "-c", LOADER.format(module=module, name=name)],
+        stdout=PIPE,
+        stderr=PIPE,
+        text=True,
+        check=False,
+    )
+
+    if result.returncode != 0:
+        raise ImportError(result.stderr.strip().splitlines()[-1])
+
+    return parse(result.stderr, module)
+
+
+def measure(entry_point: str, rounds: int) -> dict[str, Any]:
+    """Return the median import time of the entry point."""
+
+    # The first import may compile the byte code.
+    import_time(entry_point)
+    return {"median": median(import_time(entry_point) for _ in range(rounds))}
+
+
+def rows(results: Iterable[dict[str, Any]]) -> Iterator[tuple[str, str]]:
+    """Yield table rows of the results."""
+
+    yield "Entry point", "Median / budget"
+
+    for result in results:
+        if (error := result.get("error")) is not None:
+            yield result["entry_point"], f"✗ {error}"
+            continue
+
+        sign = "✓" if result["median"] <= result["budget"] else "✗"
+        yield (
+            result["entry_point"],
+            f'{sign} {result["median"]:.1f} ms / {result["budget"]:.0f} ms',
+        )
+
+
+def run() -> None:
+    """Run the import time checks."""
+
+    args = PARSER.parse_args()
+    results = []
+
+    for entry_point, budget in BUDGETS.items():
+        if args.keyword is not None and args.keyword not in entry_point:
+            continue
+
+        result: dict[str, Any] = {
+            "entry_point": entry_point,
+            "budget": budget * args.factor,
+        }
+
+        try:
+            result.update(measure(entry_point, args.rounds))
+        except ImportError as error:
+            result["error"] = str(error)
+
+        results.append(result)
+
+    print(Table.generate(rows(results)))
+
+    if args.output is not None:
+        with args.output.open("a", encoding="utf-8") as file:
+            for result in results:
+                record = {"label": args.label, "timestamp": time(), **result}
+                file.write(dumps(record) + "\n")
+
+    if any(
+        "error" in result or result["median"] > result["budget"] for result in results
+    ):
+        exit(1)
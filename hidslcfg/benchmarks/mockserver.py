@@ -0,0 +1,273 @@
+"""Stand-in for the HIS login and termgr setup web APIs.
+
+Serves /session, /setup/info, /setup/system (POST and PATCH) and
+/setup/finalize with configurable latency, error rate and payloads.
+Point the client at it by setting HIDSL_LOGIN_URL to <base>/session
+and HIDSL_SETUP_URL_BASE to <base>/setup/.
+"""
+
+from __future__ import annotations
+from argparse import ArgumentParser, Namespace
+from logging import DEBUG, INFO, basicConfig
+from datetime import datetime
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import count
+from json import dumps, load, loads
+from pathlib import Path
+from random import random, uniform
+from threading import Lock
+from time import sleep
+from typing import Any
+from uuid import uuid4
+
+from hidslcfg.common import LOG_FORMAT, LOGGER
+
+
+__all__ = ["MockServer", "run"]
+
+
+PARSER = ArgumentParser(description=__doc__)
+PARSER.add_argument("-a", "--address", default="127.0.0.1", help="bind address")
+PARSER.add_argument("-p", "--port", type=int, default=8080, help="bind port")
+PARSER.add_argument(
+    "-l",
+    "--latency",
+    type=float,
+    default=0,
+    metavar="seconds",
+    help="mean response latency",
+)
+PARSER.add_argument(
+    "-j",
+    "--jitter",
+    type=float,
+    default=0,
+    metavar="seconds",
+    help="maximum deviation from the mean latency",
+)
+PARSER.add_argument(
+    "-e",
+    "--error-rate",
+    type=float,
+    default=0,
+    metavar="ratio",
+    help="ratio of requests to fail with HTTP 500",
+)
+PARSER.add_argument("-v", "--verbose", action="store_true", help="log requests")
+PARSER.add_argument(
+    "-P",
+    "--payload",
+    type=Path,
+    metavar="file",
+    help="JSON file with the WireGuard configuration to return",
+)
+WIREGUARD = {
+    "peers": [
+        {
+            "pubkey": "vaSJKRzDCbbkwz5vqmQxeFw0sNXbbvAMNjbXRb1OYzg=",
+            "endpoint": "wg.homeinfo.de:51820",
+            "persistent_keepalive": 25,
+            "routes": [
+                {
+                    "gateway": "fd56:1dda:8794:cb90:ffff:ffff:ffff:fffe",
+                    "destination": "fd56:1dda:8794:cb90::/64",
+                    "gateway_onlink": True,
+                }
+            ],
+        }
+    ],
+}
+
+
+class MockServer(ThreadingHTTPServer):
+    """HTTP server with the mock API's state."""
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], args: Namespace):
+        super().__init__(address, RequestHandler)
+        self.latency = args.latency
+        self.jitter = args.jitter
+        self.error_rate = args.error_rate
+        self.wireguard = WIREGUARD
+
+        if args.payload is not None:
+            with args.payload.open("r", encoding="utf-8") as file:
+                self.wireguard = load(file)
+
+        self.lock = Lock()
+        self.sessions: set[str] = set()
+        self.systems: dict[int, dict[str, Any]] = {}
+        self.ids = count(1)
+
+    def add_system(self, json: dict[str, Any]) -> dict[str, Any]:
+        """Add a new system."""
+        with self.lock:
+            system_id = next(self.ids)
+            self.systems[system_id] = system = {
+                **json,
+                "id": system_id,
+                "created": datetime.now().isoformat(),
+            }
+
+        return self.with_wireguard(system)
+
+    def patch_system(self, json: dict[str, Any]) -> dict[str, Any] | None:
+        """Patch an existing system."""
+        with self.lock:
+            if (system := self.systems.get(json.get("system"))) is None:
+                return None
+
+            system.update(json)
+
+        return self.with_wireguard(system)
+
+    def with_wireguard(self, system: dict[str, Any]) -> dict[str, Any]:
+        """Return the system with its WireGuard configuration."""
+        ipaddress = f'fd56:1dda:8794:cb90::{system["id"]:x}/64'
+        return {**system, "wireguard": {"ipaddress": ipaddress, **self.wireguard}}
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    """Handles requests to the mock API."""
+
+    server: MockServer
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Log requests at DEBUG level."""
+        LOGGER.debug(format, *args)
+
+    def do_POST(self) -> None:
+        """Handle POST requests."""
+        self.handle_request("POST")
+
+    def do_PATCH(self) -> None:
+        """Handle PATCH requests."""
+        self.handle_request("PATCH")
+
+    def handle_request(self, method: str) -> None:
+        """Handle a request after the configured latency."""
+        json = self.read_json()
+
+        if (latency := self.server.latency) or self.server.jitter:
+            jitter = self.server.jitter
+            sleep(max(0, latency + uniform(-jitter, jitter)))
+
+        if random() < self.server.error_rate:
+            return self.send_json({"message": "Injected error."}, 500)
+
+        if self.path == "/session" and method == "POST":
+            return self.login(json)
+
+        if not self.logged_in:
+            return self.send_json({"message": "Not logged in."}, 401)
+
+        if self.path == "/setup/info" and method == "POST":
+            return self.info(json)
+
+        if self.path == "/setup/system" and method == "POST":
+            return self.send_json(self.server.add_system(json))
+
+        if self.path == "/setup/system" and method == "PATCH":
+            if (system := self.server.patch_system(json)) is None:
+                return self.send_json({"message": "No such system."}, 404)
+
+            return self.send_json(system)
+
+        if self.path == "/setup/finalize" and method == "POST":
+            return self.send_text("Serial number set.")
+
+        return self.send_json({"message": "Not found."}, 404)
+
+    @property
+    def logged_in(self) -> bool:
+        """Determine whether the request has a valid session cookie."""
+        cookie = SimpleCookie(self.headers.get("Cookie", ""))
+
+        if (session := cookie.get("session")) is None:
+            return False
+
+        with self.server.lock:
+            return session.value in self.server.sessions
+
+    def login(self, json: dict[str, Any]) -> None:
+        """Create a session for any credentials."""
+        if not json.get("account") or not json.get("passwd"):
+            return self.send_json({"message": "Invalid credentials."}, 401)
+
+        session = uuid4().hex
+
+        with self.server.lock:
+            self.server.sessions.add(session)
+
+        self.send_json({"id": session}, headers={"Set-Cookie": f"session={session}"})
+
+    def info(self, json: dict[str, Any]) -> None:
+        """Return information about a system."""
+        with self.server.lock:
+            system = self.server.systems.get(json.get("system"))
+
+        if system is None:
+            return self.send_json({"message": "No such system."}, 404)
+
+        self.send_json(
+            {
+                "id": system["id"],
+                "created": system["created"],
+                "operatingSystem": system.get("os"),
+                "model": system.get("model"),
+                "serialNumber": system.get("sn"),
+            }
+        )
+
+    def read_json(self) -> dict[str, Any]:
+        """Read the request's JSON body."""
+        if not (length := int(self.headers.get("Content-Length", 0))):
+            return {}
+
+        return loads(self.rfile.read(length))
+
+    def send_json(
+        self, json: Any, status: int = 200, headers: dict[str, str] | None = None
+    ) -> None:
+        """Send a JSON response."""
+        self.send_body(dumps(json).encode(), "application/json", status, headers)
+
+    def send_text(self, text: str, status: int = 200) -> None:
+        """Send a plain text response."""
+        self.send_body(text.encode(), "text/plain; charset=utf-8", status)
+
+    def send_body(
+        self,
+        body: bytes,
+        content_type: str,
+        status: int,
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        """Send a response body."""
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def run() -> None:
+    """Run the mock server."""
+
+    args = PARSER.parse_args()
+    basicConfig(level=DEBUG if args.verbose else INFO, format=LOG_FORMAT)
+    server = MockServer((args.address, args.port), args)
+    LOGGER.info("Serving mock API on http://%s:%i/.", args.address, args.port)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print()
+    finally:
+        server.server_close()
@@ -0,0 +1,79 @@
+"""Cooperative cancellation of long-running operations."""
+
+from threading import Event, Lock, Thread
+from typing import Any, Callable
+
+from hidslcfg.exceptions import Cancelled
+
+
+__all__ = ["CancellationToken"]
+
+
+POLL_INTERVAL = 0.1  # seconds
+
+
+class CancellationToken:
+    """A token to signal cancellation to an operation."""
+
+    def __init__(self):
+        self._event = Event()
+        self._lock = Lock()
+        self._callbacks: list[Callable[[], Any]] = []
+
+    @property
+    def cancelled(self) -> bool:
+        """Determine whether cancellation has been requested."""
+        return self._event.is_set()
+
+    def cancel(self) -> None:
+        """Request cancellation and run the registered callbacks."""
+        with self._lock:
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+
+        for callback in callbacks:
+            callback()
+
+    def on_cancel(self, callback: Callable[[], Any]) -> None:
+        """Register a callback to run on cancellation."""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+
+        callback()
+
+    def check(self) -> None:
+        """Raise Cancelled if cancellation has been requested."""
+        if self._event.is_set():
+            raise Cancelled("Operation cancelled.")
+
+    def run(self, function: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a blocking function in a background thread.
+
+        Returns its result or raises its exception. If cancellation is
+        requested before it returns, raises Cancelled immediately and
+        discards the function's eventual result.
+        """
+        self.check()
+        done = Event()
+        result: list[Any] = []
+        error: list[BaseException] = []
+
+        def target() -> None:
+            try:
+                result.append(function(*args, **kwargs))
+            except BaseException as exception:
+                error.append(exception)
+            finally:
+                done.set()
+
+        Thread(daemon=True, target=target).start()
+
+        while not done.wait(POLL_INTERVAL):
+            self.check()
+
+        if error:
+            raise error[0]
+
+        return result[0]
@@ -1,12 +1,21 @@
 """HOMEINFO Digital Signage Linux configurator."""
 
-from argparse import ArgumentParser
+from argparse import ArgumentParser, Namespace
+from functools import partial
+from pathlib import Path
+from subprocess import CalledProcessError
+from threading import Thread
 
-from hidslcfg.api import Client
-from hidslcfg.common import LOGGER, init_root_script
-from hidslcfg.system import ProgramErrorHandler, reboot
-from hidslcfg.termio import ask, read_credentials
-from hidslcfg.wireguard import MTU, setup
+from hidslcfg.api import SESSION_FILE, Client
+from hidslcfg.common import LOGGER, ROOT, init_root_script
+from hidslcfg.exceptions import ProgramError
+from hidslcfg.prefetch import JOBS, RATE, parse_rate, schedule
+from hidslcfg.system import ProgramErrorHandler, get_serial_number, reboot
+from hidslcfg.termio import ask, read_credentials, read_token
+from hidslcfg.trace import TRACER, report
+from hidslcfg.wireguard.mtu import mtu_type
+from hidslcfg.wireguard.offline import setup_offline
+from hidslcfg.wireguard.setup import setup
 
 
 __all__ = ["run"]
@@ -15,7 +24,10 @@ __all__ = ["run"]
 PARSER = ArgumentParser(description=__doc__)
 PARSER.add_argument("-u", "--user", metavar="user", help="user name")
 PARSER.add_argument(
-    "-s", "--serial-number", metavar="sn", help="the system's serial number"
+    "-s",
+    "--serial-number",
+    metavar="sn",
+    help="the system's serial number (detected by default)",
 )
 PARSER.add_argument(
     "-g",
@@ -34,12 +46,49 @@ PARSER.add_argument(
 PARSER.add_argument(
     "-M",
     "--mtu",
-    type=int,
-    default=MTU,
+    type=mtu_type,
+    default="auto",
     metavar="bytes",
-    help="MTU in bytes for the WireGuard interface",
+    help="MTU in bytes for the WireGuard interface or auto to measure it",
+)
+PARSER.add_argument(
+    "-O",
+    "--offline",
+    action="store_true",
+    help="queue the registration until the system is online (needs a token)",
+)
+PARSER.add_argument(
+    "-r",
+    "--root",
+    type=Path,
+    default=ROOT,
+    metavar="dir",
+    help="configure the system mounted at the given directory",
+)
+PARSER.add_argument(
+    "-p",
+    "--prefetch",
+    action="store_true",
+    help="download pending package updates in the background after setup",
+)
+PARSER.add_argument(
+    "--prefetch-jobs",
+    type=int,
+    default=JOBS,
+    metavar="n",
+    help="amount of parallel downloads when prefetching",
+)
+PARSER.add_argument(
+    "--prefetch-rate",
+    type=parse_rate,
+    default=RATE,
+    metavar="rate",
+    help="bandwidth limit when prefetching, e.g. 512K, or 0 for none",
 )
 PARSER.add_argument("-v", "--verbose", action="store_true", help="be gassy")
+PARSER.add_argument(
+    "-t", "--trace", type=Path, metavar="file", help="write a Chrome trace file"
+)
 PARSER.add_argument(
     "-o",
     "--operating-system",
@@ -59,16 +108,53 @@ MODELS.add_argument("-N", "--neptun", action="store_true", help="MOStron TSPC Ne
 PARSER.add_argument("id", nargs="?", type=int, help="the system ID")
 
 
+def prefetch_updates(args: Namespace) -> None:
+    """Schedules the download of pending package updates over the new tunnel."""
+
+    try:
+        schedule(jobs=args.prefetch_jobs, rate=args.prefetch_rate)
+    except (CalledProcessError, OSError) as error:
+        LOGGER.warning("Could not schedule prefetching updates: %s", error)
+    else:
+        LOGGER.info("Prefetching updates in the background.")
+
+
 def main() -> None:
     """Runs the HIDSL configurations."""
 
     args = init_root_script(PARSER.parse_args)
 
-    with Client() as client:
-        client.login(*read_credentials(args.user))
-        setup(client, args)
+    if args.offline and args.root != ROOT:
+        raise ProgramError("Cannot queue registrations of mounted systems.")
+
+    # The hardware of mounted systems is unknown.
+    if args.root == ROOT and args.serial_number is None:
+        args.serial_number = get_serial_number()
+
+    if args.verbose or args.trace:
+        TRACER.enable()
+
+    try:
+        if args.offline:
+            setup_offline(args, read_token())
+        else:
+            with Client(session_file=SESSION_FILE) as client:
+                Thread(daemon=True, target=client.prewarm).start()
+                client.authenticate(partial(read_credentials, args.user))
+                setup(client, args)
+    finally:
+        report(args.trace)
+
+    if args.offline:
+        LOGGER.info("Setup will be completed once the system is online.")
+    else:
+        LOGGER.info("Setup completed successfully.")
+
+    if args.root != ROOT:
+        return
 
-    LOGGER.info("Setup completed successfully.")
+    if args.prefetch and not args.offline:
+        prefetch_updates(args)
 
     if ask("Do you want to reboot now?"):
         reboot()
@@ -0,0 +1,42 @@
+"""Diagnoses the configuration and connectivity of the terminal."""
+
+from argparse import ArgumentParser
+from logging import DEBUG, INFO
+from sys import exit
+
+from hidslcfg.doctor import BUDGET, diagnose, rows
+from hidslcfg.journal import init_logging
+from hidslcfg.system import ProgramErrorHandler
+from hidslcfg.termio import Table
+
+
+__all__ = ["run"]
+
+
+PARSER = ArgumentParser(description=__doc__)
+PARSER.add_argument(
+    "-b",
+    "--budget",
+    type=float,
+    default=BUDGET,
+    metavar="seconds",
+    help="total time budget of the diagnosis",
+)
+PARSER.add_argument("-v", "--verbose", action="store_true", help="be gassy")
+
+
+def main() -> int:
+    """Runs the diagnosis and returns the exit code."""
+
+    args = PARSER.parse_args()
+    init_logging(DEBUG if args.verbose else INFO)
+    results = diagnose(budget=args.budget)
+    print(Table.generate(rows(results)))
+    return 0 if all(result.ok for result in results) else 1
+
+
+def run() -> None:
+    """Runs main() with error handling."""
+
+    with ProgramErrorHandler():
+        exit(main())
@@ -0,0 +1,52 @@
+"""Ranks the pacman mirrors of the HOMEINFO repository by latency."""
+
+from argparse import ArgumentParser
+from pathlib import Path
+
+from hidslcfg.common import init_root_script
+from hidslcfg.mirrors import CANDIDATES, TIMEOUT, rerank, rows
+from hidslcfg.system import ProgramErrorHandler
+from hidslcfg.termio import Table
+
+
+__all__ = ["run"]
+
+
+PARSER = ArgumentParser(description=__doc__)
+PARSER.add_argument(
+    "-c",
+    "--candidates",
+    type=Path,
+    default=CANDIDATES,
+    metavar="file",
+    help="file with the candidate mirrors' hosts",
+)
+PARSER.add_argument(
+    "-t",
+    "--timeout",
+    type=float,
+    default=TIMEOUT,
+    metavar="seconds",
+    help="timeout of each measurement",
+)
+PARSER.add_argument(
+    "-n", "--dry-run", action="store_true", help="do not change pacman.conf"
+)
+PARSER.add_argument("-v", "--verbose", action="store_true", help="be gassy")
+
+
+def main() -> None:
+    """Ranks the mirrors."""
+
+    args = init_root_script(PARSER.parse_args)
+    measurements = rerank(
+        candidates_file=args.candidates, timeout=args.timeout, dry_run=args.dry_run
+    )
+    print(Table.generate(rows(measurements)))
+
+
+def run() -> None:
+    """Runs main() with error handling."""
+
+    with ProgramErrorHandler():
+        main()
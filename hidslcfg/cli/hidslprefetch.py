@@ -0,0 +1,51 @@
+"""Downloads pending package updates without installing them."""
+
+from argparse import ArgumentParser
+
+from hidslcfg.common import LOGGER, init_root_script
+from hidslcfg.prefetch import JOBS, PREFETCH_SERVICE, RATE, parse_rate, prefetch
+from hidslcfg.system import ProgramErrorHandler, systemctl
+
+
+__all__ = ["run"]
+
+
+PARSER = ArgumentParser(description=__doc__)
+PARSER.add_argument(
+    "-j",
+    "--jobs",
+    type=int,
+    default=JOBS,
+    metavar="n",
+    help="amount of parallel downloads",
+)
+PARSER.add_argument(
+    "-r",
+    "--rate",
+    type=parse_rate,
+    default=RATE,
+    metavar="rate",
+    help="bandwidth limit, e.g. 512K, or 0 for none",
+)
+PARSER.add_argument("-v", "--verbose", action="store_true", help="be gassy")
+
+
+def main() -> None:
+    """Prefetches the updates and disables the scheduled prefetch."""
+
+    args = init_root_script(PARSER.parse_args)
+    summary = prefetch(jobs=args.jobs, rate=args.rate)
+    LOGGER.info(
+        "Prefetched %i packages (%.1f MiB, %i failed).",
+        summary.packages - summary.failed,
+        summary.downloaded / 1024**2,
+        summary.failed,
+    )
+    systemctl("disable", PREFETCH_SERVICE)
+
+
+def run() -> None:
+    """Runs main() with error handling."""
+
+    with ProgramErrorHandler():
+        main()
@@ -0,0 +1,120 @@
+"""Pre-provisions mounted HOMEINFO Digital Signage Linux images.
+
+The manifest is a JSON list of objects with the keys "root" (required),
+"model" (required), "id", "serial_number", "group", "operating_system",
+"mtu" and "force".
+"""
+
+from argparse import ArgumentParser, Namespace
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from json import load
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from requests.cookies import RequestsCookieJar
+
+from hidslcfg.api import SESSION_FILE, Client
+from hidslcfg.common import LOGGER, init_root_script
+from hidslcfg.exceptions import APIError, ProgramError
+from hidslcfg.system import ProgramErrorHandler
+from hidslcfg.termio import Table, read_credentials
+from hidslcfg.wireguard.common import MTU
+from hidslcfg.wireguard.setup import setup
+
+
+__all__ = ["run"]
+
+
+PARSER = ArgumentParser(description=__doc__)
+PARSER.add_argument("manifest", type=Path, help="the manifest JSON file")
+PARSER.add_argument("-u", "--user", metavar="user", help="user name")
+PARSER.add_argument(
+    "-j",
+    "--jobs",
+    type=int,
+    default=4,
+    metavar="n",
+    help="amount of images to provision concurrently",
+)
+PARSER.add_argument("-v", "--verbose", action="store_true", help="be gassy")
+
+
+def load_manifest(path: Path) -> list[Namespace]:
+    """Returns setup arguments for each image of the manifest."""
+
+    with path.open("r", encoding="utf-8") as file:
+        entries = load(file)
+
+    try:
+        return [
+            Namespace(
+                root=Path(entry["root"]),
+                model=entry["model"],
+                id=entry.get("id"),
+                serial_number=entry.get("serial_number"),
+                group=entry.get("group", 1),
+                operating_system=entry.get("operating_system", "Arch Linux"),
+                mtu=entry.get("mtu", MTU),
+                force=entry.get("force", False),
+                grace_time=0,
+            )
+            for entry in entries
+        ]
+    except KeyError as error:
+        raise ProgramError(f"Missing key in manifest: {error}") from None
+
+
+def provision(cookies: RequestsCookieJar, args: Namespace) -> str:
+    """Provisions a single image and returns the result."""
+
+    if not args.root.is_dir():
+        return "no such directory"
+
+    try:
+        with Client() as client:
+            client.session.cookies.update(cookies)
+            return f"system #{setup(client, args)}"
+    except (APIError, ProgramError) as error:
+        LOGGER.error("%s: %s", args.root, error)
+        return f"failed: {error}"
+    except Exception as error:  # Do not abort the other images.
+        LOGGER.exception("%s: Unexpected error.", args.root)
+        return f"failed: {type(error).__name__}: {error}"
+
+
+def rows(
+    images: Iterable[Namespace], results: Iterable[str]
+) -> Iterator[tuple[str, str]]:
+    """Yields table rows containing the results."""
+
+    yield "Image", "Result"
+
+    for image, result in zip(images, results):
+        yield str(image.root), result
+
+
+def main() -> None:
+    """Provisions the images of the manifest."""
+
+    args = init_root_script(PARSER.parse_args)
+    images = load_manifest(args.manifest)
+
+    with Client(session_file=SESSION_FILE) as client:
+        client.authenticate(partial(read_credentials, args.user))
+        cookies = client.session.cookies
+
+    with ThreadPoolExecutor(max_workers=args.jobs) as executor:
+        results = list(executor.map(lambda image: provision(cookies, image), images))
+
+    print(Table.generate(rows(images, results)))
+
+    if any(not result.startswith("system") for result in results):
+        raise ProgramError("Provisioning of some images failed.")
+
+
+def run() -> None:
+    """Runs main() with error handling."""
+
+    with ProgramErrorHandler():
+        main()
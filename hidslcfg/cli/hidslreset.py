@@ -1,11 +1,14 @@
 """HOMEINFO Digital Signage Linux resetter."""
 
 from argparse import ArgumentParser
+from pathlib import Path
 
 from hidslcfg.common import init_root_script
 from hidslcfg.exceptions import ProgramError
 from hidslcfg.reset import reset
 from hidslcfg.system import ProgramErrorHandler
+from hidslcfg.trace import TRACER, report
+from hidslcfg.transaction import rollback
 
 
 __all__ = ["run"]
@@ -13,18 +16,41 @@ __all__ = ["run"]
 
 PARSER = ArgumentParser(description=__doc__)
 PARSER.add_argument("-v", "--verbose", action="store_true", help="be gassy")
+PARSER.add_argument(
+    "-r",
+    "--rollback",
+    action="store_true",
+    help="undo the changes of the last setup instead of resetting",
+)
+PARSER.add_argument(
+    "-p",
+    "--purge-now",
+    action="store_true",
+    help="purge the digital signage data immediately",
+)
+PARSER.add_argument(
+    "-t", "--trace", type=Path, metavar="file", help="write a Chrome trace file"
+)
 
 
 def main() -> None:
     """Runs the HIDSL reset."""
 
-    init_root_script(PARSER.parse_args)
+    args = init_root_script(PARSER.parse_args)
+
+    if args.verbose or args.trace:
+        TRACER.enable()
 
     try:
-        reset()
+        if args.rollback:
+            rollback()
+        else:
+            reset(purge_now=args.purge_now)
     except KeyboardInterrupt:
         print()
         raise ProgramError("Reset aborted by user.") from None
+    finally:
+        report(args.trace)
 
 
 def run() -> None:
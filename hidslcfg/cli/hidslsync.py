@@ -0,0 +1,36 @@
+"""Completes queued HIDSL setups once the system is online."""
+
+from argparse import ArgumentParser
+
+from hidslcfg.common import LOGGER, init_root_script
+from hidslcfg.system import ProgramErrorHandler
+from hidslcfg.wireguard.offline import sync
+
+
+__all__ = ["run"]
+
+
+PARSER = ArgumentParser(description=__doc__)
+PARSER.add_argument(
+    "-g",
+    "--grace-time",
+    type=int,
+    default=3,
+    metavar="seconds",
+    help="seconds to wait for contacting the VPN servers",
+)
+PARSER.add_argument("-v", "--verbose", action="store_true", help="be gassy")
+
+
+def main() -> None:
+    """Runs the pending setups."""
+
+    args = init_root_script(PARSER.parse_args)
+    LOGGER.info("Completed %i pending setups.", sync(grace_time=args.grace_time))
+
+
+def run() -> None:
+    """Runs main() with error handling."""
+
+    with ProgramErrorHandler():
+        main()
@@ -0,0 +1,41 @@
+"""Provisions an unconfigured terminal from the magic USB key."""
+
+from argparse import ArgumentParser
+
+from hidslcfg.common import LOGGER, init_root_script
+from hidslcfg.system import ProgramErrorHandler, reboot
+from hidslcfg.ztp import is_configured, provision
+
+
+__all__ = ["run"]
+
+
+PARSER = ArgumentParser(description=__doc__)
+PARSER.add_argument(
+    "-f",
+    "--force",
+    action="store_true",
+    help="provision already configured systems",
+)
+PARSER.add_argument("-v", "--verbose", action="store_true", help="be gassy")
+
+
+def main() -> None:
+    """Runs the zero-touch provisioning."""
+
+    args = init_root_script(PARSER.parse_args)
+
+    if is_configured() and not args.force:
+        LOGGER.info("System is already configured.")
+        return
+
+    if provision():
+        LOGGER.info("Provisioning completed, rebooting.")
+        reboot()
+
+
+def run() -> None:
+    """Runs main() with error handling."""
+
+    with ProgramErrorHandler():
+        main()
@@ -1,7 +1,7 @@
 """Global constants and configuration."""
 
 from argparse import Namespace
-from logging import DEBUG, INFO, basicConfig, getLogger
+from logging import DEBUG, INFO, getLogger
 from os import getenv, geteuid
 from pathlib import Path
 from sys import argv
@@ -17,15 +17,20 @@ __all__ = [
     "DDBOSSTART",
     "DDBOSSTART_TEMPLATE",
     "DIGSIG_DATA_DIR",
+    "DIGSIG_TRASH_DIR",
     "HIDSL_DEBUG",
     "HTML5DS",
     "INSTALLATION_INSTRUCTIONS_SERVICE",
     "LOGGER",
     "LOG_FORMAT",
+    "MIRRORS_TIMER",
+    "ROOT",
+    "STATE_DIR",
     "SYSTEMD_NETWORKD",
     "SYSTEMD_NETWORK_DIR",
     "UNCONFIGURED_WARNING_SERVICE",
     "init_root_script",
+    "rooted",
 ]
 
 
@@ -33,24 +38,37 @@ APPLICATION_SERVICE = "application.service"
 CHROMIUM_SERVICE = "chromium.service"
 DDB_OS_PKG_NAME = "ddb-os"
 DIGSIG_DATA_DIR = Path("/var/lib/digsig")
+DIGSIG_TRASH_DIR = Path("/var/lib/digsig.trash")  # Same file system as data.
 HIDSL_DEBUG = getenv("HIDSL_DEBUG")
 HTML5DS = "html5ds.service"
 INSTALLATION_INSTRUCTIONS_SERVICE = "installation-instructions.service"
 LOG_FORMAT = "[%(levelname)s] %(name)s: %(message)s"
 LOGGER = getLogger(Path(argv[0]).name)
+MIRRORS_TIMER = "hidslcfg-mirrors.timer"
+ROOT = Path("/")
+STATE_DIR = Path("/var/lib/hidslcfg")
 SYSTEMD_NETWORKD = "systemd-networkd.service"
 SYSTEMD_NETWORK_DIR = Path("/etc/systemd/network")
 UNCONFIGURED_WARNING_SERVICE = "unconfigured-warning.service"
 DDBOSSTART_TEMPLATE = Path("/usr/share/hidslcfg/index.html.template")
 DDBOSSTART = Path("/srv/index.html")
 
+
 def init_root_script(args_getter: Callable) -> Namespace:
     """Initializes a script that shall be run as root."""
 
+    from hidslcfg.journal import init_logging  # Imports this module.
+
     args = args_getter()
-    basicConfig(level=DEBUG if args.verbose else INFO, format=LOG_FORMAT)
+    init_logging(DEBUG if args.verbose else INFO)
 
     if geteuid() != 0:
         raise ProgramError("You need to be root to run this script!")
 
     return args
+
+
+def rooted(path: Path, root: Path = ROOT) -> Path:
+    """Returns the absolute path within the given root directory."""
+
+    return root / path.relative_to(ROOT)
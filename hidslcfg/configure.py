@@ -1,25 +1,31 @@
 """Basic system configuration."""
 
 from ipaddress import IPv4Address, IPv6Address
-from typing import Any, Iterable
+from pathlib import Path
+from typing import Any, Iterable, Iterator
 
 from hidslcfg.common import (
     INSTALLATION_INSTRUCTIONS_SERVICE,
     LOGGER,
+    MIRRORS_TIMER,
+    ROOT,
     UNCONFIGURED_WARNING_SERVICE,
-    DDBOSSTART_TEMPLATE,
-    DDBOSSTART
+    rooted,
 )
 from hidslcfg.exceptions import ProgramError
-from hidslcfg.hosts import set_ip
-from hidslcfg.pacman import set_server
-from hidslcfg.system import set_hostname, systemctl
+from hidslcfg.hosts import HOSTS, render_ip
+from hidslcfg.journal import set_field
+from hidslcfg.pacman import PACMAN_CONF, render_server
+from hidslcfg.progress import Progress, Step
+from hidslcfg.reconcile import File, Hostname, Resource, Service
+from hidslcfg.reconcile import apply, log_plan, plan, unit_exists
+from hidslcfg.rollback import Rollback
+from hidslcfg.startpage import create_ddbos_start, get_context, pages
 from hidslcfg.termio import ask, Table
-from hidslcfg.system import get_system_id, is_ddb_os_system
+from hidslcfg.system import HOSTNAME, is_ddb_os_system
 
-from pathlib import Path
 
-__all__ = ["confirm", "configure","create_ddbos_start"]
+__all__ = ["confirm", "configure", "create_ddbos_start", "desired_state"]
 
 
 APPCMD_HOSTNAME = "appcmd.homeinfo.intra"
@@ -80,24 +86,71 @@ def confirm(system: dict, serial_number: str = None, force: bool = False) -> Non
         raise ProgramError("Setup aborted by user.")
 
 
-def configure(system: int, server: IPv4Address | IPv6Address) -> None:
-    """Configures the system with the given ID."""
-
-    LOGGER.debug("Configuring host name.")
-    set_hostname(str(system))
-    LOGGER.debug("Updating /etc/hosts.")
-    set_ip(APPCMD_HOSTNAME, server)
-    LOGGER.debug("Updating /etc/pacman.conf.")
-    set_server("homeinfo", server)
-    LOGGER.debug("Disabling unconfigured warning.")
-    systemctl("disable", UNCONFIGURED_WARNING_SERVICE)
-    systemctl("enable", INSTALLATION_INSTRUCTIONS_SERVICE)
-    create_ddbos_start()
-def create_ddbos_start()->None:
-    if is_ddb_os_system():
-        system=get_system_id()
-        with DDBOSSTART_TEMPLATE.open(encoding="utf-8") as file:
-            start_template = file.read()
-        start_template = start_template.format(system=system)
-        with DDBOSSTART.open(mode="w", encoding="utf-8") as indexfile:
-            indexfile.write(start_template)
+def desired_state(
+    system: int, server: IPv4Address | IPv6Address, *, root: Path = ROOT
+) -> Iterator[Resource]:
+    """Yields the resources of the configured system.
+
+    Outside of the running system, the host name file is written directly.
+    """
+
+    if root == ROOT:
+        yield Hostname(Step.HOSTNAME, str(system))
+    else:
+        yield File(Step.HOSTNAME, rooted(HOSTNAME, root), f"{system}\n")
+
+    hosts = rooted(HOSTS, root)
+    yield File(Step.HOSTS, hosts, render_ip(APPCMD_HOSTNAME, server, path=hosts))
+    pacman_conf = rooted(PACMAN_CONF, root)
+    yield File(
+        Step.PACMAN,
+        pacman_conf,
+        render_server("homeinfo", server, path=pacman_conf),
+    )
+    yield Service(Step.SERVICES, UNCONFIGURED_WARNING_SERVICE, False, root=root)
+    yield Service(Step.SERVICES, INSTALLATION_INSTRUCTIONS_SERVICE, True, root=root)
+
+    # Images with an older package lack the timer.
+    if unit_exists(MIRRORS_TIMER, root=root):
+        yield Service(Step.SERVICES, MIRRORS_TIMER, True, root=root)
+    else:
+        LOGGER.warning("Not enabling %s, which is not installed.", MIRRORS_TIMER)
+
+    if is_ddb_os_system(root=root):
+        context = get_context(system, root=root)
+
+        for page in pages(root=root):
+            yield File(Step.SERVICES, page.output, page.render(context))
+
+
+def configure(
+    system: int,
+    server: IPv4Address | IPv6Address,
+    *,
+    progress: Progress = Progress(),
+    rollback: Rollback | None = None,
+    resources: Iterable[Resource] = (),
+    root: Path = ROOT,
+) -> set[str]:
+    """Configures the system with the given ID.
+
+    Only resources that differ from the desired state are changed.
+    Additional resources, e.g. unit files, are reconciled alongside.
+    If a rollback is given, the undo actions of all changes are registered.
+    If a root directory is given, the system mounted there is configured.
+    Returns the units which need to be restarted.
+    """
+
+    if root == ROOT:
+        # Mounted systems may be provisioned concurrently.
+        set_field("SYSTEM_ID", system)
+
+    resources = [*desired_state(system, server, root=root), *resources]
+    log_plan(changes := plan(resources))
+    return apply(
+        changes,
+        steps=[resource.step for resource in resources],
+        progress=progress,
+        rollback=rollback,
+    )
+
@@ -0,0 +1,284 @@
+"""Concurrent diagnostics of a terminal.
+
+All checks run concurrently, each with its own deadline, and the whole
+diagnosis finishes within a total time budget.
+"""
+
+from __future__ import annotations
+from asyncio import (
+    Future,
+    TimeoutError,
+    all_tasks,
+    create_subprocess_exec,
+    gather,
+    get_running_loop,
+    new_event_loop,
+    open_connection,
+    wait_for,
+)
+from asyncio.subprocess import DEVNULL, PIPE
+from dataclasses import dataclass
+from ipaddress import IPv6Address
+from socket import SOCK_STREAM, getaddrinfo
+from threading import Thread
+from time import perf_counter
+from typing import Any, Awaitable, Callable, Iterable, Iterator
+from urllib.parse import urlparse
+
+from hidslcfg.common import LOGGER, SYSTEMD_NETWORKD
+from hidslcfg.configure import APPCMD_HOSTNAME
+from hidslcfg.hosts import HostsEntry, read_hosts
+from hidslcfg.pacman import read_servers
+from hidslcfg.system import PING, SYSTEMCTL
+from hidslcfg.wifi import list_wifi_interfaces
+from hidslcfg.wireguard.common import DEVNAME, SERVER
+
+
+__all__ = ["BUDGET", "CHECKS", "Check", "Result", "diagnose", "rows"]
+
+
+BUDGET = 5  # seconds
+NETWORKCTL = "/usr/bin/networkctl"
+REPOSITORY_PORT = 8080
+WPA_CLI = "/usr/bin/wpa_cli"
+
+
+@dataclass(frozen=True)
+class Result:
+    """Result of a check."""
+
+    name: str
+    ok: bool
+    detail: str
+    duration: float = 0
+
+
+@dataclass(frozen=True)
+class Check:
+    """A named check with a deadline.
+
+    The function returns whether the check succeeded and a detail message.
+    """
+
+    name: str
+    function: Callable[[], Awaitable[tuple[bool, str]]]
+    deadline: float = 3
+
+    async def run(self, budget: float) -> Result:
+        """Run the check within its deadline and the budget."""
+        start = perf_counter()
+
+        try:
+            ok, detail = await wait_for(self.function(), min(self.deadline, budget))
+        except TimeoutError:
+            ok, detail = False, "timed out"
+        except Exception as error:  # Report any failure as result.
+            LOGGER.debug("Check %s failed.", self.name, exc_info=True)
+            ok, detail = False, str(error) or type(error).__name__
+
+        return Result(self.name, ok, detail, perf_counter() - start)
+
+
+async def execute(*command: Any) -> tuple[int, str]:
+    """Run a command and return its exit code and output.
+
+    The process is killed if the check is cancelled.
+    """
+
+    process = await create_subprocess_exec(
+        *map(str, command), stdout=PIPE, stderr=DEVNULL
+    )
+
+    try:
+        stdout, _ = await process.communicate()
+    except BaseException:
+        process.kill()
+        await process.wait()
+        raise
+
+    return process.returncode, stdout.decode(errors="replace").strip()
+
+
+async def resolve(host: str, port: int) -> str:
+    """Resolve the host's first address in a daemon thread.
+
+    Unlike the loop's default executor, a hanging lookup does not keep
+    the loop or the interpreter from shutting down.
+    """
+
+    loop = get_running_loop()
+    future: Future[str] = loop.create_future()
+
+    def settle(result: str | None, error: OSError | None) -> None:
+        if future.done():
+            return
+
+        if error is None:
+            future.set_result(result)
+        else:
+            future.set_exception(error)
+
+    def target() -> None:
+        try:
+            info = getaddrinfo(host, port, type=SOCK_STREAM)
+        except OSError as error:
+            result, exception = None, error
+        else:
+            result, exception = info[0][4][0], None
+
+        try:
+            loop.call_soon_threadsafe(settle, result, exception)
+        except RuntimeError:  # The loop has been closed.
+            pass
+
+    Thread(daemon=True, target=target).start()
+    return await future
+
+
+async def probe(host: str, port: int) -> None:
+    """Open and close a TCP connection."""
+
+    _, writer = await open_connection(await resolve(host, port), port)
+    writer.close()
+    await writer.wait_closed()
+
+
+async def check_networkd() -> tuple[bool, str]:
+    """Check whether systemd-networkd is running."""
+
+    returncode, state = await execute(SYSTEMCTL, "is-active", SYSTEMD_NETWORKD)
+    return returncode == 0, state or "unknown"
+
+
+async def check_link() -> tuple[bool, str]:
+    """Check whether the WireGuard link is configured."""
+
+    returncode, output = await execute(NETWORKCTL, "--no-legend", "list", DEVNAME)
+
+    if returncode != 0 or not output:
+        return False, "link not found"
+
+    # IDX LINK TYPE OPERATIONAL SETUP
+    *_, operational, setup = output.split()
+    return setup == "configured", f"{operational}, {setup}"
+
+
+async def check_hosts() -> tuple[bool, str]:
+    """Check whether the application host points to the VPN server."""
+
+    for entry in read_hosts():
+        if isinstance(entry, HostsEntry) and APPCMD_HOSTNAME in {
+            entry.hostname,
+            entry.short_name,
+        }:
+            return entry.ipaddr == SERVER, str(entry.ipaddr)
+
+    return False, "no entry"
+
+
+async def check_pacman() -> tuple[bool, str]:
+    """Check whether the homeinfo repository uses the VPN server.
+
+    Ranked mirrors may precede it.
+    """
+
+    address = f"[{SERVER}]" if isinstance(SERVER, IPv6Address) else str(SERVER)
+
+    if not (servers := read_servers("homeinfo")):
+        return False, "no server"
+
+    return any(address in server for server in servers), servers[0]
+
+
+async def check_wifi() -> tuple[bool, str]:
+    """Check whether all Wi-Fi interfaces are associated."""
+
+    if not (interfaces := list(list_wifi_interfaces())):
+        return True, "no Wi-Fi interface"
+
+    outputs = await gather(
+        *(execute(WPA_CLI, "-i", interface, "status") for interface in interfaces)
+    )
+    details, ok = [], True
+
+    for interface, (_, output) in zip(interfaces, outputs):
+        status = dict(line.split("=", 1) for line in output.splitlines() if "=" in line)
+        ok &= (state := status.get("wpa_state", "unknown")) == "COMPLETED"
+        details.append(f"{interface}: {status.get('ssid', state)}")
+
+    return ok, ", ".join(details)
+
+
+async def check_vpn() -> tuple[bool, str]:
+    """Check whether the VPN server responds to pings."""
+
+    returncode, _ = await execute(PING, "-W", 1, "-c", 1, SERVER)
+    return returncode == 0, str(SERVER)
+
+
+async def check_repository() -> tuple[bool, str]:
+    """Check whether the repository server accepts connections."""
+
+    await probe(str(SERVER), REPOSITORY_PORT)
+    return True, f"port {REPOSITORY_PORT}"
+
+
+async def check_internet() -> tuple[bool, str]:
+    """Check whether the API server accepts connections."""
+
+    from hidslcfg.api import LOGIN_URL  # Avoid importing requests.
+
+    url = urlparse(LOGIN_URL)
+    await probe(url.hostname, url.port or 443)
+    return True, url.hostname
+
+
+CHECKS = (
+    Check("systemd-networkd", check_networkd),
+    Check("WireGuard link", check_link),
+    Check("/etc/hosts", check_hosts),
+    Check("pacman server", check_pacman),
+    Check("Wi-Fi", check_wifi),
+    Check("Internet", check_internet),
+    Check("VPN server", check_vpn),
+    Check("Repository", check_repository),
+)
+
+
+async def diagnose_async(checks: Iterable[Check], budget: float) -> list[Result]:
+    """Run all checks concurrently."""
+
+    return await gather(*(check.run(budget) for check in checks))
+
+
+def diagnose(
+    checks: Iterable[Check] = CHECKS, *, budget: float = BUDGET
+) -> list[Result]:
+    """Run all checks concurrently within the budget.
+
+    Checks time out within the budget, so the loop is closed right after
+    without waiting for leftover tasks.
+    """
+
+    loop = new_event_loop()
+
+    try:
+        return loop.run_until_complete(diagnose_async(checks, budget))
+    finally:
+        if tasks := all_tasks(loop):
+            for task in tasks:
+                task.cancel()
+
+            loop.run_until_complete(gather(*tasks, return_exceptions=True))
+
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
+
+
+def rows(results: Iterable[Result]) -> Iterator[tuple[str, str]]:
+    """Yield table rows containing the results."""
+
+    yield "Check", "Result"
+
+    for result in results:
+        yield result.name, f"{'✓' if result.ok else '✗'} {result.detail}"
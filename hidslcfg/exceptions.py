@@ -5,17 +5,23 @@ from json import JSONDecodeError
 from os import linesep
 
 
-__all__ = ["APIError", "ProgramError"]
+__all__ = ["APIError", "Cancelled", "ProgramError"]
 
 
 class APIError(Exception):
     """Indicates an error while using the web API."""
 
-    def __init__(self, text: str | None = None, json: dict | None = None):
+    def __init__(
+        self,
+        text: str | None = None,
+        json: dict | None = None,
+        status: int | None = None,
+    ):
         """Sets the raw error message text and / or JSON."""
         super().__init__()
         self.text = text
         self.json = json
+        self.status = status
 
     def __str__(self):
         """Returns the respective message text."""
@@ -33,7 +39,7 @@ class APIError(Exception):
         except JSONDecodeError:
             json = None
 
-        return cls(text=response.text, json=json)
+        return cls(text=response.text, json=json, status=response.status_code)
 
 
 class ProgramError(Exception):
@@ -49,3 +55,7 @@ class ProgramError(Exception):
     def __str__(self):
         """Returns the respective message text."""
         return linesep.join(str(message) for message in self.messages)
+
+
+class Cancelled(ProgramError):
+    """Indicates that an operation was cancelled."""
@@ -1,9 +1,13 @@
 """Common mixins."""
 
 from __future__ import annotations
+from concurrent.futures import Future
 from dataclasses import dataclass
+from logging import getLogger
 from pathlib import Path
-from typing import TypeVar
+from threading import BoundedSemaphore, Lock, Thread
+from time import perf_counter
+from typing import Any, Callable, Hashable, TypeVar
 
 from gi import require_version
 
@@ -11,7 +15,9 @@ require_version("Gtk", "3.0")
 require_version("Gdk", "3.0")
 from gi.repository import Gdk, GLib, Gtk, GObject
 
+from hidslcfg.cancel import CancellationToken
 from hidslcfg.common import HIDSL_DEBUG
+from hidslcfg.exceptions import Cancelled
 
 
 __all__ = [
@@ -20,15 +26,143 @@ __all__ = [
     "Gtk",
     "GObject",
     "GObjectT",
+    "EXECUTOR",
     "SetupParameters",
     "BuilderWindow",
+    "LazyWindow",
     "SubElement",
+    "TaskExecutor",
 ]
 
 
 ASSETS_DIR = Path("/usr/share/hidslcfg")
+LOGGER = getLogger(__file__)
 TRANSLATIONS = {"Invalid credentials.": "Ungültige Anmeldedaten."}
 GObjectT = TypeVar("GObjectT", bound=GObject.Object)
+MAX_WORKERS = 4
+
+
+class TaskExecutor:
+    """Runs background tasks and dispatches their results on the main loop.
+
+    Tasks run in daemon threads, so that pending tasks never block quitting.
+    Only one task per key runs at a time and callbacks scheduled while
+    others are pending are handled within a single main loop iteration.
+    """
+
+    def __init__(self, max_workers: int = MAX_WORKERS):
+        self.slots = BoundedSemaphore(max_workers)
+        self.lock = Lock()
+        self.tasks: dict[Hashable, tuple[Future, CancellationToken | None]] = {}
+        self.callbacks: dict[Hashable, Callable[[], Any]] = {}
+
+    def submit(
+        self,
+        key: Hashable,
+        function: Callable[..., Any],
+        *args: Any,
+        on_done: Callable[[Any], Any] | None = None,
+        on_error: Callable[[BaseException], Any] | None = None,
+        token: CancellationToken | None = None,
+    ) -> Future:
+        """Run a function in the background unless the key's task is running.
+
+        The callbacks are invoked in the main loop. Errors without
+        an error callback are logged.
+        """
+        with self.lock:
+            if (task := self.tasks.get(key)) is not None:
+                LOGGER.debug("Task %s is already running.", key)
+                return task[0]
+
+            self.tasks[key] = (future := Future(), token)
+
+        future.add_done_callback(
+            lambda _: self.on_task_done(key, future, on_done, on_error)
+        )
+        Thread(daemon=True, target=self.run, args=(future, function, args)).start()
+        return future
+
+    def run(self, future: Future, function: Callable[..., Any], args: tuple) -> None:
+        """Run the function within a worker slot."""
+        with self.slots:
+            if not future.set_running_or_notify_cancel():
+                return
+
+            try:
+                result = function(*args)
+            except BaseException as error:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def cancel(self, key: Hashable) -> None:
+        """Cancel the task of the given key."""
+        with self.lock:
+            if (task := self.tasks.get(key)) is None:
+                return
+
+        future, token = task
+        future.cancel()
+
+        if token is not None:
+            token.cancel()
+
+    def on_task_done(
+        self,
+        key: Hashable,
+        future: Future,
+        on_done: Callable[[Any], Any] | None,
+        on_error: Callable[[BaseException], Any] | None,
+    ) -> None:
+        """Release the key and dispatch the result."""
+        with self.lock:
+            self.tasks.pop(key, None)
+
+        if future.cancelled():
+            error = Cancelled("Task cancelled.")
+        else:
+            error = future.exception()
+
+        if error is None:
+            if on_done is not None:
+                self.dispatch(lambda: on_done(future.result()), key=future)
+        elif on_error is not None:
+            self.dispatch(lambda: on_error(error), key=future)
+        else:
+            LOGGER.error("Task %s failed: %s", key, error)
+
+    def dispatch(self, callback: Callable[[], Any], key: Hashable = None) -> None:
+        """Invoke the callback in the main loop.
+
+        A callback with the key of a still pending callback is dropped.
+        """
+        with self.lock:
+            if key is not None and key in self.callbacks:
+                return
+
+            schedule = not self.callbacks
+            self.callbacks[object() if key is None else key] = callback
+
+        if schedule:
+            GLib.idle_add(self.on_idle)
+
+    def on_idle(self) -> bool:
+        """Invoke all pending callbacks."""
+        with self.lock:
+            callbacks = list(self.callbacks.values())
+            self.callbacks.clear()
+
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:  # Run the remaining callbacks, e.g. unlock_gui.
+                LOGGER.exception("Callback %s failed.", callback)
+
+        return GLib.SOURCE_REMOVE
+
+
+EXECUTOR = TaskExecutor()
 
 
 @dataclass
@@ -43,10 +177,13 @@ class SetupParameters:
 class BuilderWindow:
     """A window mixin."""
 
+    file: str
+    _builder: Gtk.Builder | None
+
     def __init__(self, name: str, *, primary: Gtk.Widget | None = None):
         """Initialize builder and main window."""
-        self._next_window: BuilderWindow | None = None
-        self._home_window: BuilderWindow | None = None
+        self._next_window: BuilderWindow | LazyWindow | None = None
+        self._home_window: BuilderWindow | LazyWindow | None = None
         self._primary_widget: Gtk.Widget | None = primary
         self.window: Gtk.Window = self.build(name)
         self.builder.connect_signals(self.window)
@@ -54,13 +191,31 @@ class BuilderWindow:
         self.window.connect("destroy", self.on_destroy)
 
     def __init_subclass__(cls, file: str, **kwargs):
-        """Set builder file and window name."""
-        cls.builder = builder = Gtk.Builder()
-        builder.add_from_file(str(get_asset(file)))
+        """Set builder file.
+
+        The file is parsed on first use of the builder,
+        not at import time of the subclass.
+        """
+        cls.file = file
+        cls._builder = None
+
+    @property
+    def builder(self) -> Gtk.Builder:
+        """Return the class' builder, parsing its file on first access."""
+        if (cls := type(self))._builder is None:
+            start = perf_counter()
+            cls._builder = builder = Gtk.Builder()
+            builder.add_from_file(str(get_asset(cls.file)))
+            LOGGER.debug("Parsed %s in %.3f s.", cls.file, perf_counter() - start)
+
+        return cls._builder
 
     def bind(
-        self, *, next: BuilderWindow | None = None, home: BuilderWindow | None = None
-    ) -> BuilderWindow:
+        self,
+        *,
+        next: BuilderWindow | LazyWindow | None = None,
+        home: BuilderWindow | LazyWindow | None = None,
+    ) -> BuilderWindow | LazyWindow:
         """Bind the next an optionally the home window and
         returns the former allowing for a builder pattern.
         """
@@ -88,7 +243,7 @@ class BuilderWindow:
         if self._primary_widget is not None:
             self.window.set_focus(self._primary_widget)
 
-    def switch_window(self, window: BuilderWindow) -> None:
+    def switch_window(self, window: BuilderWindow | LazyWindow) -> None:
         """Switch to the given window."""
         self.window.hide()
         window.show()
@@ -118,6 +273,74 @@ class BuilderWindow:
         """Shows an error message."""
         self.show_message(message, message_type=Gtk.MessageType.ERROR)
 
+    def run_task(
+        self,
+        key: Hashable,
+        function: Callable[..., Any],
+        *args: Any,
+        on_done: Callable[[Any], Any] | None = None,
+        on_error: Callable[[BaseException], Any] | None = None,
+        token: CancellationToken | None = None,
+    ) -> Future:
+        """Run a background task, showing errors unless handled otherwise."""
+        return EXECUTOR.submit(
+            key,
+            function,
+            *args,
+            on_done=on_done,
+            on_error=on_error or self.on_task_error,
+            token=token,
+        )
+
+    def on_task_error(self, error: BaseException) -> None:
+        """Show the error of a failed background task."""
+        if isinstance(error, Cancelled):
+            return
+
+        LOGGER.error("Background task failed.", exc_info=error)
+        self.show_error(str(error))
+
+
+class LazyWindow:
+    """Proxy for a builder window that is constructed on first show."""
+
+    def __init__(self, factory: Callable[[], BuilderWindow]):
+        """Set the factory to create the actual window."""
+        self._factory = factory
+        self._window: BuilderWindow | None = None
+        self._next_window: BuilderWindow | LazyWindow | None = None
+        self._home_window: BuilderWindow | LazyWindow | None = None
+
+    @property
+    def instance(self) -> BuilderWindow:
+        """Return the actual window, creating it if necessary."""
+        if self._window is None:
+            self._window = self._factory()
+            self._window.bind(next=self._next_window, home=self._home_window)
+
+        return self._window
+
+    def bind(
+        self,
+        *,
+        next: BuilderWindow | LazyWindow | None = None,
+        home: BuilderWindow | LazyWindow | None = None,
+    ) -> BuilderWindow | LazyWindow:
+        """Bind the next and optionally the home window
+        and returns the former allowing for a builder pattern.
+        """
+        self._next_window = next
+        self._home_window = home
+
+        if self._window is not None:
+            self._window.bind(next=next, home=home)
+
+        return next
+
+    def show(self) -> None:
+        """Create the window if necessary and show it."""
+        self.instance.show()
+
 
 class SubElement:
     """Window sub-element."""
@@ -145,6 +368,33 @@ class SubElement:
         for widget in self.widgets:
             widget.set_property("sensitive", True)
 
+    def run_task(
+        self,
+        function: Callable[..., Any],
+        *args: Any,
+        on_done: Callable[[Any], Any] | None = None,
+        on_error: Callable[[BaseException], Any] | None = None,
+    ) -> Future:
+        """Run a background task while the GUI widgets are locked.
+
+        Only one task per sub-element runs at a time.
+        """
+        self.lock_gui()
+
+        def done(result: Any) -> None:
+            self.unlock_gui()
+
+            if on_done is not None:
+                on_done(result)
+
+        def error(exception: BaseException) -> None:
+            self.unlock_gui()
+            (on_error or self.builder_window.on_task_error)(exception)
+
+        return self.builder_window.run_task(
+            self, function, *args, on_done=done, on_error=error
+        )
+
 
 def get_asset(filename: str) -> Path:
     """Return the path to an asset file."""
@@ -1,40 +1,78 @@
 """GUI application."""
 
-from os import geteuid
+from functools import partial
+from logging import DEBUG, INFO, getLogger
+from os import geteuid, sysconf
+from pathlib import Path
 from sys import stderr
 
-from hidslcfg.api import Client
+from hidslcfg.api import SESSION_FILE, Client
 from hidslcfg.common import HIDSL_DEBUG
-from hidslcfg.gui.api import Gtk, SetupParameters
+from hidslcfg.gui.api import GLib, Gtk, LazyWindow, SetupParameters
 from hidslcfg.gui.windows import CompletedForm
 from hidslcfg.gui.windows import InstallationForm
 from hidslcfg.gui.windows import MainWindow
 from hidslcfg.gui.windows import SetupForm
+from hidslcfg.journal import init_logging
 
 
-__all__ = ["run"]
+__all__ = ["create_windows", "run"]
+
+
+LOGGER = getLogger(__file__)
+PROC_SELF_STAT = Path("/proc/self/stat")
+PROC_UPTIME = Path("/proc/uptime")
 
 
 def run() -> None:
     """Run the GUI."""
 
+    init_logging(DEBUG if HIDSL_DEBUG else INFO)
+
     if not HIDSL_DEBUG and geteuid() != 0:
         print("This program requires root privileges.", file=stderr)
         raise SystemExit(1)
 
-    client = Client()
-    setup_parameters = SetupParameters()
+    LOGGER.debug("Modules imported after %.2f s.", process_uptime())
+    home_window = create_windows(Client(session_file=SESSION_FILE), SetupParameters())
+    LOGGER.debug("Main window created after %.2f s.", process_uptime())
+    home_window.show()
+    # Idle callbacks run after the pending redraw, i.e. after the first frame.
+    GLib.idle_add(log_startup_time)
+    Gtk.main()
+
 
-    home_window = MainWindow(client)
+def create_windows(client: Client, setup_parameters: SetupParameters) -> MainWindow:
+    """Create the main window and bind the subsequent windows to it."""
 
-    home_window.bind(next=SetupForm(client, setup_parameters)).bind(
-        next=InstallationForm(client, setup_parameters), home=home_window
-    ).bind(next=CompletedForm(setup_parameters), home=home_window).bind(
+    home_window = MainWindow(client)
+    home_window.bind(
+        next=LazyWindow(partial(SetupForm, client, setup_parameters))
+    ).bind(
+        next=LazyWindow(partial(InstallationForm, client, setup_parameters)),
+        home=home_window,
+    ).bind(
+        next=LazyWindow(partial(CompletedForm, setup_parameters)), home=home_window
+    ).bind(
         next=None, home=home_window
     )
+    return home_window
 
-    home_window.show()
-    Gtk.main()
+
+def log_startup_time() -> bool:
+    """Log the time it took to show the main window."""
+
+    LOGGER.info("Main window shown after %.2f s.", process_uptime())
+    return GLib.SOURCE_REMOVE
+
+
+def process_uptime() -> float:
+    """Return the seconds passed since this process was started."""
+
+    # The start time is the 22nd field, the 2nd one (comm) may contain spaces.
+    start_time = int(PROC_SELF_STAT.read_text().rsplit(")", 1)[1].split()[19])
+    uptime = float(PROC_UPTIME.read_text().split()[0])
+    return uptime - start_time / sysconf("SC_CLK_TCK")
 
 
 if __name__ == "__main__":
@@ -1,15 +1,16 @@
 """Installing window logic."""
 
 from logging import getLogger
-from threading import Thread
 from time import sleep
 
 from hidslcfg.api import Client
+from hidslcfg.cancel import CancellationToken
 from hidslcfg.common import HIDSL_DEBUG
-from hidslcfg.exceptions import APIError, ProgramError
-from hidslcfg.gui.api import GLib, Gtk, BuilderWindow, SetupParameters
+from hidslcfg.exceptions import Cancelled
+from hidslcfg.gui.api import EXECUTOR, Gtk, BuilderWindow, SetupParameters
+from hidslcfg.progress import Progress, ProgressEvent, QueueProgress, State, Step
 from hidslcfg.system import is_ddb_os_system
-from hidslcfg.wireguard import MTU, create, patch
+from hidslcfg.wireguard.setup import create, patch
 
 
 __all__ = ["InstallationForm"]
@@ -17,6 +18,18 @@ __all__ = ["InstallationForm"]
 
 LOGGER = getLogger(__file__)
 SLEEP = 3
+STEPS = {
+    Step.KEYPAIR: "Schlüsselpaar erzeugen",
+    Step.API: "System registrieren",
+    Step.HOSTNAME: "Hostnamen setzen",
+    Step.HOSTS: "/etc/hosts anpassen",
+    Step.PACMAN: "/etc/pacman.conf anpassen",
+    Step.SERVICES: "Dienste konfigurieren",
+    Step.UNITS: "WireGuard konfigurieren",
+    Step.NETWORKD: "Netzwerk neu starten",
+    Step.READINESS: "VPN-Server kontaktieren",
+}
+STATES = {State.STARTED: "…", State.COMPLETED: "✓", State.FAILED: "✗"}
 
 
 class InstallationForm(BuilderWindow, file="installation.glade"):
@@ -28,59 +41,139 @@ class InstallationForm(BuilderWindow, file="installation.glade"):
         self.client = client
         self.setup_parameters: SetupParameters = setup_parameters
         self.spinner: Gtk.Spinner = self.build("spinner")
+        self.progress_bar: Gtk.ProgressBar = self.build("progress")
+        self.steps: Gtk.Label = self.build("steps")
+        self.cancel: Gtk.Button = self.build("cancel")
+        self.cancel.connect("activate", self.on_cancel)
+        self.cancel.connect("clicked", self.on_cancel)
+        self.token = CancellationToken()
+        self.progress = QueueProgress(self.schedule_progress_update)
+        self.step_events: dict[Step, ProgressEvent] = {}
 
     def on_show(self, *_) -> None:
         """Perform the setup process when window is shown."""
+        self.token = self.progress.token = CancellationToken()
+        self.progress.drain()
+        self.step_events.clear()
+        self.update_progress()
+        self.cancel.set_sensitive(True)
+        # Do not let a stray key press cancel the installation.
+        self.window.set_focus(None)
         self.spinner.start()
-        Thread(daemon=True, target=self.safe_install).start()
+        self.run_task(
+            self,
+            self.cancellable_install,
+            self.token,
+            on_done=lambda _: self.on_installation_completed(None),
+            on_error=self.on_installation_failed,
+            token=self.token,
+        )
+
+    def on_cancel(self, *_) -> None:
+        """Request cancellation of the installation."""
+        self.cancel.set_sensitive(False)
+        EXECUTOR.cancel(self)
 
-    def safe_install(self) -> None:
-        """Run the installation with caught exceptions."""
-        try:
+    def cancellable_install(self, token: CancellationToken) -> None:
+        """Run the installation, aborting requests on cancellation."""
+        with self.client.cancellable(token):
             self.install()
-        except ProgramError as program_error:
-            error = str(program_error)
-        except APIError as api_error:
-            error = str(api_error)
-        except Exception as exception:
-            error = str(exception)
-        else:
-            error = None
 
-        GLib.idle_add(lambda: self.on_installation_completed(error))
+    def on_installation_failed(self, error: BaseException) -> None:
+        """Handle errors and cancellation of the installation."""
+        if isinstance(error, Cancelled):
+            return self.on_installation_completed(None, cancelled=True)
+
+        LOGGER.error("Installation failed.", exc_info=error)
+        self.on_installation_completed(str(error))
 
     def install(self) -> None:
         """Run the installation."""
         if HIDSL_DEBUG:
             LOGGER.warning("Sleeping for %s seconds due to debug mode.", SLEEP)
-            return sleep(SLEEP)
+            return simulate(self.progress)
 
         self.setup_parameters.system_id = setup(
             self.client,
             self.setup_parameters.system_id,
             self.setup_parameters.serial_number,
             self.setup_parameters.model,
+            self.progress,
+        )
+
+    def schedule_progress_update(self) -> None:
+        """Schedule a GUI update unless one is already pending.
+
+        This is called from the installation thread.
+        """
+        EXECUTOR.dispatch(self.on_progress, key=self.progress)
+
+    def on_progress(self) -> None:
+        """Process all queued progress events at once."""
+        for event in self.progress.drain():
+            self.step_events[event.step] = event
+
+        self.update_progress()
+
+    def update_progress(self) -> None:
+        """Update the progress bar and step list."""
+        completed = sum(
+            event.state is State.COMPLETED for event in self.step_events.values()
         )
+        self.progress_bar.set_fraction(completed / len(Step))
+        self.progress_bar.set_text(f"{completed} / {len(Step)}")
+        self.steps.set_text("\n".join(map(format_event, self.step_events.values())))
 
-    def on_installation_completed(self, error: str | None) -> None:
+    def on_installation_completed(
+        self, error: str | None, cancelled: bool = False
+    ) -> None:
         """Continue to the next window."""
+        self.on_progress()
         self.spinner.stop()
+        self.cancel.set_sensitive(False)
 
         if error:
             self.show_error(error)
 
+        if cancelled:
+            return self.go_home()
+
         self.next_window()
 
 
+def format_event(event: ProgressEvent) -> str:
+    """Format a progress event for the step list."""
+
+    text = f"{STATES[event.state]} {STEPS[event.step]}"
+
+    if event.duration is None:
+        return text
+
+    return f"{text} ({event.duration:.2f} s)"
+
+
+def simulate(progress: Progress) -> None:
+    """Simulate the installation steps in debug mode."""
+
+    for step in Step:
+        with progress.step(step):
+            sleep(SLEEP / len(Step))
+
+
 def setup(
-    client: Client, system_id: int | None, serial_number: str | None, model: str
+    client: Client,
+    system_id: int | None,
+    serial_number: str | None,
+    model: str,
+    progress: Progress,
 ) -> int:
     """Run the setup."""
 
     if system_id is None:
         return create(
             client,
-            mtu=MTU,
+            mtu=None,
+            progress=progress,
             os="Arch Linux",
             model=model,
             sn=serial_number,
@@ -91,7 +184,8 @@ def setup(
     return patch(
         client,
         system_id,
-        mtu=MTU,
+        mtu=None,
+        progress=progress,
         os="Arch Linux",
         model=model,
         sn=serial_number,
@@ -4,7 +4,8 @@ from logging import getLogger
 
 from hidslcfg.api import Client
 from hidslcfg.common import HIDSL_DEBUG
-from hidslcfg.gui.api import Gtk, BuilderWindow
+from hidslcfg.gui.api import EXECUTOR, Gtk, BuilderWindow
+from hidslcfg.gui.windows.main.doctor_tab import DoctorTab
 from hidslcfg.gui.windows.main.login_tab import LoginTab
 from hidslcfg.gui.windows.main.ping_tab import PingTab
 from hidslcfg.gui.windows.main.wifi_tab import WifiTab
@@ -34,10 +35,17 @@ class MainWindow(BuilderWindow, file="main.glade"):
         # Ping tab
         self.ping_tab = PingTab(self)
 
+        # Diagnostics tab
+        self.doctor_tab = DoctorTab(self)
+
         self.btn_quit: Gtk.Button = self.build("quit")
         self.btn_quit.connect("activate", self.on_quit)
         self.btn_quit.connect("clicked", self.on_quit)
 
+    def on_show(self, *_) -> None:
+        """Warm up the API connections while the user enters credentials."""
+        EXECUTOR.submit((self, "prewarm"), self.client.prewarm)
+
     def on_quit(self, *_) -> None:
         """Handles the quit button."""
         message_dialog = Gtk.MessageDialog(
@@ -0,0 +1,43 @@
+"""Diagnostics tab logic."""
+
+from hidslcfg.doctor import Result, diagnose
+from hidslcfg.gui.api import Gtk, BuilderWindow, SubElement
+
+
+__all__ = ["DoctorTab"]
+
+
+class DoctorTab(SubElement):
+    """Diagnostics tab."""
+
+    def __init__(self, window: BuilderWindow):
+        super().__init__(window)
+        self.results: Gtk.Label = self.build("doctor_results")
+        self.spinner: Gtk.Spinner = self.build("doctor_spinner")
+        self.run: Gtk.Button = self.build("doctor_run")
+        self.run.connect("activate", self.on_run)
+        self.run.connect("clicked", self.on_run)
+
+    def on_run(self, *_) -> None:
+        """Run the diagnosis."""
+        self.spinner.start()
+        self.run_task(
+            diagnose,
+            on_done=self.on_diagnosis_completed,
+            on_error=self.on_diagnosis_failed,
+        )
+
+    def on_diagnosis_failed(self, error: BaseException) -> None:
+        """Stop the spinner and show the error."""
+        self.spinner.stop()
+        self.on_task_error(error)
+
+    def on_diagnosis_completed(self, results: list[Result]) -> None:
+        """Show the results."""
+        self.spinner.stop()
+        self.results.set_text(
+            "\n".join(
+                f"{'✓' if result.ok else '✗'} {result.name}: {result.detail}"
+                for result in results
+            )
+        )
@@ -1,9 +1,6 @@
 """Login window logic."""
 
-from threading import Thread
-
-from hidslcfg.exceptions import APIError
-from hidslcfg.gui.api import GLib, Gtk, BuilderWindow, SubElement
+from hidslcfg.gui.api import Gtk, BuilderWindow, SubElement
 
 
 __all__ = ["LoginTab"]
@@ -21,36 +18,30 @@ class LoginTab(SubElement):
         self.login: Gtk.Button = self.build("login")
         self.login.connect("activate", self.on_login)
         self.login.connect("clicked", self.on_login)
+        self.session_restored = self.client.restore_session()
+
+        if self.session_restored:
+            self.user_name.set_placeholder_text("Sitzung aktiv")
 
     def on_login(self, *_) -> None:
         """Perform the login."""
-        if not (user_name := self.user_name.get_text()):
-            return self.show_error("Kein Benutzername angegeben.")
+        user_name = self.user_name.get_text()
+        password = self.password.get_text()
 
-        if not (password := self.password.get_text()):
-            return self.show_error("Kein Passwort angegeben.")
+        if self.session_restored and not user_name and not password:
+            return self.next_window()
 
-        self.lock_gui()
-        Thread(
-            daemon=True, target=self.login_thread, args=(user_name, password)
-        ).start()
+        if not user_name:
+            return self.show_error("Kein Benutzername angegeben.")
 
-    def login_thread(self, user_name: str, password: str) -> None:
-        """Login thread."""
-        try:
-            self.client.login(user_name, password)
-        except APIError as api_error:
-            error = str(api_error)
-        else:
-            error = None
+        if not password:
+            return self.show_error("Kein Passwort angegeben.")
 
-        GLib.idle_add(lambda: self.on_login_done(error))
+        self.client.credentials = lambda: (user_name, password)
+        self.run_task(
+            self.client.login, user_name, password, on_done=self.on_login_done
+        )
 
-    def on_login_done(self, error: str | None) -> None:
+    def on_login_done(self, _) -> None:
         """Run after login is done."""
-        self.unlock_gui()
-
-        if error:
-            return self.show_error(error)
-
         self.next_window()
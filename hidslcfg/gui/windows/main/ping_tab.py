@@ -1,9 +1,8 @@
 """Login window logic."""
 
 from subprocess import CalledProcessError
-from threading import Thread
 
-from hidslcfg.gui.api import GLib, Gtk, BuilderWindow, SubElement
+from hidslcfg.gui.api import Gtk, BuilderWindow, SubElement
 from hidslcfg.system import ping
 
 
@@ -32,28 +31,25 @@ class PingTab(SubElement):
 
     def on_ping(self, *args) -> None:
         """Ping the set host."""
-        self.lock_gui()
         self.on_hostname_change(*args)
         self.host.set_label("")
         self.spinner.start()
-        Thread(daemon=True, target=self.ping_thread).start()
-
-    def ping_thread(self) -> None:
-        """Ping the host."""
-        try:
-            ping(self.hostname.get_active_id())
-        except CalledProcessError:
-            success = False
-        else:
-            success = True
+        self.run_task(
+            ping_host,
+            self.hostname.get_active_id(),
+            on_done=self.on_ping_completed,
+            on_error=self.on_ping_failed,
+        )
 
-        GLib.idle_add(lambda: self.on_ping_completed(success))
+    def on_ping_failed(self, error: BaseException) -> None:
+        """Reset the button and show the error."""
+        self.on_ping_completed(False)
+        self.on_task_error(error)
 
     def on_ping_completed(self, success: bool) -> None:
         """Set the ping result."""
         self.spinner.stop()
         self.host.set_label(self.host_label)
-        self.unlock_gui()
 
         if success:
             self.result.set_from_icon_name(
@@ -63,3 +59,14 @@ class PingTab(SubElement):
             self.result.set_from_icon_name(
                 "face-sad-symbolic", Gtk.IconSize.LARGE_TOOLBAR
             )
+
+
+def ping_host(hostname: str) -> bool:
+    """Ping the host and return whether it responded."""
+
+    try:
+        ping(hostname)
+    except CalledProcessError:
+        return False
+
+    return True
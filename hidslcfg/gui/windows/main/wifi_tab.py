@@ -1,13 +1,17 @@
 """Login window logic."""
 
+from functools import partial
+from logging import getLogger
 from subprocess import CalledProcessError
-from threading import Thread
 
-from hidslcfg.gui.api import GLib, Gtk, BuilderWindow, SubElement
+from hidslcfg.gui.api import EXECUTOR, GLib, Gtk, BuilderWindow, SubElement
+from hidslcfg.magic_usb import MagicUSBWatcher
+from hidslcfg.wifi import MAGIC_FILE_NAME
 from hidslcfg.wifi import MAX_PSK_LEN
 from hidslcfg.wifi import MIN_PSK_LEN
 from hidslcfg.wifi import configure
 from hidslcfg.wifi import disable
+from hidslcfg.wifi import from_magic_file
 from hidslcfg.wifi import from_magic_usb_key
 from hidslcfg.wifi import load_wifi_configs
 from hidslcfg.wifi import list_wifi_interfaces
@@ -16,22 +20,45 @@ from hidslcfg.wifi import list_wifi_interfaces
 __all__ = ["WifiTab"]
 
 
+LOGGER = getLogger(__file__)
+
+
 class WifiTab(SubElement):
     """Wi-Fi setup tab."""
 
     def __init__(self, window: BuilderWindow):
         super().__init__(window)
-        self.wifi_configs = load_wifi_configs()
+        self.wifi_configs: dict[str, dict[str, str]] = {}
         self.interfaces: Gtk.ComboBoxText = self.build("interfaces")
         self.load_config: Gtk.LinkButton = self.build("load_wifi_config")
         self.ssid: Gtk.Entry = self.build("ssid")
         self.psk: Gtk.Entry = self.build("psk")
         self.configure: Gtk.Button = self.build("configure_wifi")
-        self.populate_interfaces()
         self.load_config.connect("activate-link", self.on_load_config)
-        self.interfaces.connect("changed", self.on_interface_select)
         self.configure.connect("activate", self.on_configure)
         self.configure.connect("clicked", self.on_configure)
+        self.watcher = MagicUSBWatcher(self.on_magic_usb_key_change)
+        # Do not delay showing the main window by reading the system's state.
+        GLib.idle_add(self.populate)
+
+    def populate(self) -> bool:
+        """Load the Wi-Fi configurations and populate the tab."""
+        self.wifi_configs = load_wifi_configs()
+        self.populate_interfaces()
+        self.interfaces.connect("changed", self.on_interface_select)
+
+        try:
+            self.watcher.start()
+        except OSError as error:
+            LOGGER.warning("Cannot watch for magic USB keys: %s", error)
+
+        return GLib.SOURCE_REMOVE
+
+    def on_magic_usb_key_change(self, files: dict[str, str] | None) -> None:
+        """Handle insertion of the magic USB key in the watcher thread."""
+        if files is not None and MAGIC_FILE_NAME in files:
+            config = from_magic_file(files[MAGIC_FILE_NAME])
+            EXECUTOR.dispatch(partial(self.on_load_config_done, config))
 
     def populate_interfaces(self) -> None:
         """Populate interfaces combo box."""
@@ -48,34 +75,37 @@ class WifiTab(SubElement):
         self.psk.set_text(config.get("psk", ""))
 
     def on_load_config(self, *_) -> None:
-        """After Wi-Fi config processing."""
-        self.lock_gui()
-        Thread(daemon=True, target=self.load_config_thread).start()
-
-    def load_config_thread(self) -> None:
         """Load the configuration from the magic USB key."""
-        config = {}
-        error = None
-
-        try:
-            config = from_magic_usb_key()
-        except CalledProcessError:
-            error = "Konnte USB-Stick nicht einhängen."
-        except FileNotFoundError:
-            error = "Keine WLAN Konfigurationsdatei gefunden."
-        except PermissionError:
-            error = "Keine Berechtigung WLAN Konfigurationsdatei zu lesen."
+        if (files := self.watcher.files) and MAGIC_FILE_NAME in files:
+            return self.on_load_config_done(from_magic_file(files[MAGIC_FILE_NAME]))
 
-        GLib.idle_add(lambda: self.on_load_config_done(config, error))
+        self.run_task(
+            from_magic_usb_key,
+            on_done=self.on_load_config_done,
+            on_error=self.on_load_config_failed,
+        )
 
-    def on_load_config_done(self, config: dict, error: str | None) -> None:
+    def on_load_config_done(self, config: dict) -> None:
         """Run when configuration is done."""
         self.ssid.set_text(config.get("ssid", ""))
         self.psk.set_text(config.get("psk", ""))
-        self.unlock_gui()
 
-        if error:
-            self.show_error(error)
+    def on_load_config_failed(self, error: BaseException) -> None:
+        """Clear the form and show the error."""
+        self.on_load_config_done({})
+
+        if isinstance(error, CalledProcessError):
+            return self.show_error("Konnte USB-Stick nicht einhängen.")
+
+        if isinstance(error, FileNotFoundError):
+            return self.show_error("Keine WLAN Konfigurationsdatei gefunden.")
+
+        if isinstance(error, PermissionError):
+            return self.show_error(
+                "Keine Berechtigung WLAN Konfigurationsdatei zu lesen."
+            )
+
+        self.on_task_error(error)
 
     def on_configure(self, *_) -> None:
         """Perform Wi-Fi configuration."""
@@ -98,27 +128,24 @@ class WifiTab(SubElement):
                 f"Schlüssel darf maximal {MAX_PSK_LEN} Zeichen lang sein."
             )
 
-        self.lock_gui()
-        Thread(
-            daemon=True, target=self.configure_thread, args=(interface, ssid, psk)
-        ).start()
+        self.run_task(
+            configure_exclusively,
+            interface,
+            ssid,
+            psk,
+            on_error=self.on_configure_failed,
+        )
 
-    def configure_thread(self, interface: str, ssid: str, psk: str) -> None:
-        """Actually perform the configuration."""
-        error = None
+    def on_configure_failed(self, error: BaseException) -> None:
+        """Callback when configuration failed."""
+        if isinstance(error, (CalledProcessError, PermissionError)):
+            return self.show_error("Konnte WLAN Verbindung nicht einrichten.")
 
-        try:
-            configure(interface, ssid, psk)
-        except (CalledProcessError, PermissionError):
-            error = "Konnte WLAN Verbindung nicht einrichten."
-        else:
-            disable(set(list_wifi_interfaces()) - {interface})
+        self.on_task_error(error)
 
-        GLib.idle_add(lambda: self.on_configure_done(error))
 
-    def on_configure_done(self, error: str | None) -> None:
-        """Callback when configuration is done."""
-        self.unlock_gui()
+def configure_exclusively(interface: str, ssid: str, psk: str) -> None:
+    """Configure the interface and disable all others."""
 
-        if error:
-            return self.show_error(error)
+    configure(interface, ssid, psk)
+    disable(set(list_wifi_interfaces()) - {interface})
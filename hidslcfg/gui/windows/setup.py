@@ -6,6 +6,7 @@ from typing import Callable
 
 from hidslcfg.api import Client
 from hidslcfg.gui.api import Gtk, GObjectT, BuilderWindow, SetupParameters
+from hidslcfg.system import get_serial_number
 
 
 __all__ = ["SetupForm"]
@@ -36,6 +37,12 @@ class SetupForm(BuilderWindow, file="setup.glade"):
         self.home: Gtk.Button = self.build("home")
         self.home.connect("activate", self.go_home)
         self.home.connect("clicked", self.go_home)
+        self.run_task(self, get_serial_number, on_done=self.on_serial_number)
+
+    def on_serial_number(self, serial_number: str | None) -> None:
+        """Prefill the hardware's serial number."""
+        if serial_number and not self.serial_number.get_text():
+            self.serial_number.set_text(serial_number)
 
     def get_system_id(self) -> int | None:
         """Return the system ID."""
@@ -7,8 +7,10 @@ from os import linesep
 from pathlib import Path
 from typing import Iterable, Iterator
 
+from hidslcfg.trace import traced
 
-__all__ = ["set_ip"]
+
+__all__ = ["HOSTS", "render_ip", "set_ip"]
 
 
 HOSTS = Path("/etc/hosts")
@@ -42,10 +44,10 @@ class HostsEntry:
         return cls(ip_address(ipaddr), hostname, short_name)
 
 
-def read_hosts() -> Iterator[str | HostsEntry]:
+def read_hosts(path: Path | None = None) -> Iterator[str | HostsEntry]:
     """Yields host entries."""
 
-    with HOSTS.open("r", encoding="ascii") as file:
+    with (path or HOSTS).open("r", encoding="ascii") as file:
         for line in file:
             if not (line := line.strip()) or line.startswith("#"):
                 yield line
@@ -53,23 +55,45 @@ def read_hosts() -> Iterator[str | HostsEntry]:
                 yield HostsEntry.from_string(line)
 
 
+def render_hosts(entries: Iterable[str | HostsEntry]) -> str:
+    """Returns the text of the hosts file."""
+
+    return linesep.join(map(str, entries)) + linesep
+
+
 def write_hosts(entries: Iterable[str | HostsEntry]) -> None:
     """Yields host entries."""
 
     # Generate text before opening the file to prevent r/w race condition.
-    text = linesep.join(map(str, entries))
+    text = render_hosts(entries)
 
     with HOSTS.open("w", encoding="ascii") as file:
         file.write(text)
-        file.write(linesep)
 
 
-def set_ip(hostname: str, ipaddr: IPv4Address | IPv6Address):
-    """Sets the IP address of a host."""
+def update_ip(
+    hostname: str, ipaddr: IPv4Address | IPv6Address, *, path: Path | None = None
+) -> list[str | HostsEntry]:
+    """Returns the host entries with the IP address of a host set."""
 
-    for entry in (hosts := list(read_hosts())):
+    for entry in (hosts := list(read_hosts(path))):
         if isinstance(entry, HostsEntry):
             if hostname in {entry.hostname, entry.short_name}:
                 entry.ipaddr = ipaddr
 
-    write_hosts(hosts)
+    return hosts
+
+
+def render_ip(
+    hostname: str, ipaddr: IPv4Address | IPv6Address, *, path: Path | None = None
+) -> str:
+    """Returns the text of the hosts file with the IP address of a host set."""
+
+    return render_hosts(update_ip(hostname, ipaddr, path=path))
+
+
+@traced("set IP address in /etc/hosts")
+def set_ip(hostname: str, ipaddr: IPv4Address | IPv6Address):
+    """Sets the IP address of a host."""
+
+    write_hosts(update_ip(hostname, ipaddr))
@@ -0,0 +1,215 @@
+"""Non-blocking logging to the systemd journal.
+
+Records are put into a queue by the emitting thread and formatted and
+written by a listener thread, so that slow consoles do not stall setup.
+Records are sent to journald with structured fields, e.g.
+
+    LOGGER.info("Done.", extra={"STAGE": "API", "DURATION_MS": 42})
+
+Fields set via set_field(), e.g. SYSTEM_ID, are added to all records.
+The log can then be queried by field, e.g. journalctl SYSTEM_ID=1234.
+"""
+
+from __future__ import annotations
+from atexit import register
+from contextlib import contextmanager
+from logging import (
+    CRITICAL,
+    DEBUG,
+    ERROR,
+    INFO,
+    WARNING,
+    Filter,
+    Formatter,
+    Handler,
+    LogRecord,
+    StreamHandler,
+    getLogger,
+)
+from logging.handlers import QueueHandler, QueueListener
+from os import fstat, getenv
+from pathlib import Path
+from queue import SimpleQueue
+from re import compile as compile_regex
+from socket import AF_UNIX, SOCK_DGRAM, socket
+from struct import pack
+from typing import Any, Iterator
+
+from hidslcfg.common import LOG_FORMAT, LOGGER
+
+
+__all__ = [
+    "FIELDS",
+    "JOURNAL_SOCKET",
+    "JournalHandler",
+    "attached",
+    "flush",
+    "init_logging",
+    "set_field",
+]
+
+
+FIELD_NAME = compile_regex("[A-Z][A-Z0-9_]*")
+FIELDS: dict[str, Any] = {}
+JOURNAL_SOCKET = Path("/run/systemd/journal/socket")
+PRIORITIES = {CRITICAL: 2, ERROR: 3, WARNING: 4, INFO: 6, DEBUG: 7}
+LISTENER: QueueListener | None = None
+
+
+class JournalHandler(Handler):
+    """Sends records to journald via its native protocol."""
+
+    def __init__(self, identifier: str = LOGGER.name, path: Path = JOURNAL_SOCKET):
+        super().__init__()
+        self.identifier = identifier
+        self.socket = socket(AF_UNIX, SOCK_DGRAM)
+        self.socket.connect(str(path))
+
+    def emit(self, record: LogRecord) -> None:
+        """Send the record to the journal."""
+        try:
+            self.socket.send(b"".join(encode(*item) for item in self.fields(record)))
+        except Exception:  # Never fail on logging.
+            self.handleError(record)
+
+    def fields(self, record: LogRecord) -> Iterator[tuple[str, Any]]:
+        """Yield the journal fields of the record."""
+        yield "MESSAGE", self.format(record)
+        yield "PRIORITY", priority(record.levelno)
+        yield "SYSLOG_IDENTIFIER", self.identifier
+        yield "LOGGER", record.name
+        yield "THREAD_NAME", record.threadName
+        yield "CODE_FILE", record.pathname
+        yield "CODE_LINE", record.lineno
+        yield "CODE_FUNC", record.funcName
+
+        for key, value in vars(record).items():
+            if value is not None and FIELD_NAME.fullmatch(key):
+                yield key, value
+
+    def close(self) -> None:
+        """Close the socket."""
+        self.socket.close()
+        super().close()
+
+
+class FieldFilter(Filter):
+    """Adds the global fields to the records."""
+
+    def filter(self, record: LogRecord) -> bool:
+        """Set the fields that the record does not set itself."""
+        for key, value in FIELDS.items():
+            if not hasattr(record, key):
+                setattr(record, key, value)
+
+        return True
+
+
+def encode(key: str, value: Any) -> bytes:
+    """Encode a field in the journal's native format."""
+
+    data = str(value).encode("utf-8", errors="replace")
+
+    if b"\n" in data:
+        return key.encode() + b"\n" + pack("<Q", len(data)) + data + b"\n"
+
+    return key.encode() + b"=" + data + b"\n"
+
+
+def priority(level: int) -> int:
+    """Return the syslog priority of a log level."""
+
+    for threshold, value in PRIORITIES.items():
+        if level >= threshold:
+            return value
+
+    return PRIORITIES[DEBUG]
+
+
+def set_field(key: str, value: Any) -> None:
+    """Add a field to all subsequent records."""
+
+    FIELDS[key] = value
+
+
+def is_journal_stream() -> bool:
+    """Determine whether stderr already goes to the journal.
+
+    JOURNAL_STREAM is inherited by child processes, so the device and inode
+    it names must match those of stderr.
+    """
+
+    if (value := getenv("JOURNAL_STREAM")) is None:
+        return False
+
+    try:
+        device, inode = map(int, value.split(":"))
+        stat = fstat(2)
+    except (OSError, ValueError):
+        return False
+
+    return (stat.st_dev, stat.st_ino) == (device, inode)
+
+
+def init_logging(level: int, *, console: bool | None = None) -> None:
+    """Log non-blocking to the journal and optionally to the console.
+
+    By default, the console is only used if stderr does not already go
+    to the journal or the journal is not available.
+    """
+
+    global LISTENER
+
+    handlers: list[Handler] = []
+
+    try:
+        handlers.append(JournalHandler())
+    except OSError:
+        console = True
+
+    if console is None:
+        console = not is_journal_stream()
+
+    if console:
+        handlers.append(stream := StreamHandler())
+        stream.setFormatter(Formatter(LOG_FORMAT))
+
+    queue: SimpleQueue[LogRecord] = SimpleQueue()
+    handler = QueueHandler(queue)
+    handler.addFilter(FieldFilter())
+    (root := getLogger()).addHandler(handler)
+    root.setLevel(level)
+    LISTENER = QueueListener(queue, *handlers, respect_handler_level=True)
+    LISTENER.start()
+    register(LISTENER.stop)
+
+
+@contextmanager
+def attached(handler: Handler) -> Iterator[Handler]:
+    """Additionally handle records with the given handler."""
+
+    if LISTENER is None:
+        (root := getLogger()).addHandler(handler)
+
+        try:
+            yield handler
+        finally:
+            root.removeHandler(handler)
+
+        return
+
+    LISTENER.handlers = (*LISTENER.handlers, handler)
+
+    try:
+        yield handler
+    finally:
+        flush()
+        LISTENER.handlers = tuple(h for h in LISTENER.handlers if h is not handler)
+
+
+def flush() -> None:
+    """Wait until all queued records have been handled."""
+
+    if LISTENER is not None:
+        LISTENER.stop()
+        LISTENER.start()
@@ -1,29 +1,48 @@
 """Magic USB key with configuration."""
 
+from __future__ import annotations
 from pathlib import Path
-from subprocess import CompletedProcess, run
+from socket import AF_NETLINK, SOCK_DGRAM, socket
+from subprocess import PIPE, CalledProcessError, CompletedProcess, run
 from tempfile import TemporaryDirectory
+from threading import Thread
+from typing import Any, Callable, Iterable
 
+from hidslcfg.common import LOGGER
 
-__all__ = ["MagicUSBKey"]
 
+__all__ = ["FILES", "MagicUSBKey", "MagicUSBWatcher"]
 
+
+BLKID = Path("/usr/bin/blkid")
+FILES = ("wifi.txt",)
 LABEL = "DDBCFG"
+READ_ONLY = "ro,nosuid,nodev,noexec"
+NETLINK_KOBJECT_UEVENT = 15  # Not exported by the socket module.
 SEARCH_DIR = Path("/dev/disk/by-label")
+UEVENT_BUFSIZE = 16384
+UEVENT_GROUP_KERNEL = 1
 
 
 class MagicUSBKey:
     """Context manager to mount and umount the USB stick."""
 
-    def __init__(self, *, label: str = LABEL):
-        self._device: Path = SEARCH_DIR / label
+    def __init__(
+        self,
+        *,
+        label: str = LABEL,
+        device: Path | None = None,
+        options: str = READ_ONLY,
+    ):
+        self._device: Path = SEARCH_DIR / label if device is None else device
+        self._options = options
         self._temporary_directory: TemporaryDirectory | None = None
         self._mountpoint: str | None = None
 
     def __enter__(self) -> Path:
         self._temporary_directory = TemporaryDirectory()
         self._mountpoint = self._temporary_directory.__enter__()
-        mount(self._device, self._mountpoint)
+        mount(self._device, self._mountpoint, options=self._options)
         return self.mountpoint
 
     def __exit__(self, typ, value, traceback):
@@ -37,10 +56,130 @@ class MagicUSBKey:
         return Path(self._mountpoint)
 
 
-def mount(device: str | Path, mountpoint: str | Path) -> CompletedProcess:
+class MagicUSBWatcher:
+    """Watches for the magic USB key using kernel uevents.
+
+    When the key is inserted, it is mounted read-only once, all recognised
+    files are read into the cache and it is unmounted again.
+    The callback receives the cached files on insertion and None on removal.
+    It is called from the watcher thread.
+    """
+
+    def __init__(
+        self,
+        on_change: Callable[[dict[str, str] | None], Any],
+        *,
+        label: str = LABEL,
+        files: Iterable[str] = FILES,
+    ):
+        self.on_change = on_change
+        self.label = label
+        self.file_names = tuple(files)
+        self.device: Path | None = None
+        self.files: dict[str, str] | None = None
+        self.socket: socket | None = None
+
+    def start(self) -> None:
+        """Start watching for the key."""
+        self.socket = socket(AF_NETLINK, SOCK_DGRAM, NETLINK_KOBJECT_UEVENT)
+        self.socket.bind((0, UEVENT_GROUP_KERNEL))
+        Thread(daemon=True, target=self.watch).start()
+
+    def stop(self) -> None:
+        """Stop watching for the key."""
+        if self.socket is not None:
+            self.socket.close()
+            self.socket = None
+
+    def watch(self) -> None:
+        """Handle the already present key and all subsequent uevents."""
+        if (device := SEARCH_DIR / self.label).exists():
+            self.insert(device.resolve())
+
+        while (sock := self.socket) is not None:
+            try:
+                event = parse_uevent(sock.recv(UEVENT_BUFSIZE))
+            except OSError:
+                return
+
+            if event.get("SUBSYSTEM") != "block" or "DEVNAME" not in event:
+                continue
+
+            device = Path("/dev") / event["DEVNAME"]
+
+            if event.get("ACTION") == "remove" and device == self.device:
+                self.remove()
+            elif event.get("ACTION") in {"add", "change"} and device != self.device:
+                if get_label(device) == self.label:
+                    self.insert(device)
+
+    def insert(self, device: Path) -> None:
+        """Read the files of the inserted key."""
+        LOGGER.info("Magic USB key inserted: %s", device)
+
+        try:
+            self.files = read_files(device, self.file_names)
+        except CalledProcessError:
+            LOGGER.error("Could not mount magic USB key %s.", device)
+            return
+
+        self.device = device
+        self.on_change(self.files)
+
+    def remove(self) -> None:
+        """Clear the cache of the removed key."""
+        LOGGER.info("Magic USB key removed: %s", self.device)
+        self.device = self.files = None
+        self.on_change(None)
+
+
+def parse_uevent(data: bytes) -> dict[str, str]:
+    """Parse a kernel uevent of the form "action@devpath\\0KEY=value\\0..."."""
+
+    return dict(
+        field.decode(errors="replace").split("=", 1)
+        for field in data.split(b"\0")[1:]
+        if b"=" in field
+    )
+
+
+def get_label(device: Path) -> str | None:
+    """Return the file system label of a block device."""
+
+    result = run(
+        [str(BLKID), "-o", "value", "-s", "LABEL", str(device)],
+        stdout=PIPE,
+        text=True,
+    )
+    return result.stdout.strip() or None
+
+
+def read_files(device: Path, file_names: Iterable[str]) -> dict[str, str]:
+    """Read the existing files from the device's root directory."""
+
+    files = {}
+
+    with MagicUSBKey(device=device) as mountpoint:
+        for file_name in file_names:
+            try:
+                files[file_name] = (mountpoint / file_name).read_text(encoding="utf-8")
+            except (FileNotFoundError, PermissionError, UnicodeDecodeError) as error:
+                LOGGER.debug("Skipping %s: %s", file_name, error)
+
+    return files
+
+
+def mount(
+    device: str | Path, mountpoint: str | Path, *, options: str | None = None
+) -> CompletedProcess:
     """Mount a device."""
 
-    return run(["/usr/bin/mount", str(device), str(mountpoint)], check=True, text=True)
+    command = ["/usr/bin/mount", str(device), str(mountpoint)]
+
+    if options is not None:
+        command[1:1] = ["-o", options]
+
+    return run(command, check=True, text=True)
 
 
 def umount(mountpoint_or_device: str | Path) -> CompletedProcess:
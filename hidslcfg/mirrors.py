@@ -0,0 +1,211 @@
+"""Latency-ranked pacman mirrors.
+
+The candidates are the VPN server and the hosts listed in the candidates
+file, one host or host:port per line. Each candidate's connect latency and
+throughput are measured concurrently. The reachable ones are written as
+servers of the repository, fastest first.
+"""
+
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from dataclasses import dataclass
+from ipaddress import IPv6Address, ip_address
+from pathlib import Path
+from platform import machine
+from re import fullmatch
+from socket import create_connection
+from time import perf_counter
+from typing import Iterable, Iterator
+from urllib.parse import urlsplit
+from urllib.request import Request, urlopen
+
+from hidslcfg.common import LOGGER
+from hidslcfg.exceptions import ProgramError
+from hidslcfg.pacman import PACMAN_CONF, read_servers, render_servers
+from hidslcfg.trace import traced
+from hidslcfg.wireguard.common import SERVER
+
+
+__all__ = ["CANDIDATES", "Measurement", "candidates", "rank", "rerank", "rows"]
+
+
+CANDIDATES = Path("/etc/hidslcfg/mirrors")
+PORT = 8080
+REFERENCE_SIZE = 1024 * 1024  # bytes
+REPO = "homeinfo"
+SAMPLE_SIZE = 64 * 1024  # bytes
+TIMEOUT = 5  # seconds
+URL_PATTERN = "http://[^/]*/(.*)"
+
+
+@dataclass(frozen=True)
+class Measurement:
+    """Connect latency and throughput of a mirror."""
+
+    url: str
+    latency: float | None = None  # seconds
+    throughput: float | None = None  # bytes per second
+    error: str | None = None
+
+    @property
+    def score(self) -> float | None:
+        """Return the estimated time to fetch a reference file."""
+        if self.latency is None or not self.throughput:
+            return None
+
+        return self.latency + REFERENCE_SIZE / self.throughput
+
+
+def to_netloc(host: str) -> str:
+    """Return host and port of the candidate, using the default port."""
+
+    with suppress(ValueError):
+        if isinstance(address := ip_address(host), IPv6Address):
+            return f"[{address}]:{PORT}"
+
+        return f"{address}:{PORT}"
+
+    return host if urlsplit(f"//{host}").port else f"{host}:{PORT}"
+
+
+def candidates(path: Path | None = None) -> list[str]:
+    """Return the hosts of the candidate mirrors."""
+
+    hosts = [to_netloc(str(SERVER))]
+
+    try:
+        text = (path or CANDIDATES).read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return hosts
+
+    for line in text.splitlines():
+        if (line := line.split("#", 1)[0].strip()) and (
+            netloc := to_netloc(line)
+        ) not in hosts:
+            hosts.append(netloc)
+
+    return hosts
+
+
+def database_url(url: str, repo: str) -> str:
+    """Return the URL of the repository's database on the mirror."""
+
+    url = url.replace("$repo", repo).replace("$arch", machine())
+    return f"{url.rstrip('/')}/{repo}.db"
+
+
+def measure(url: str, repo: str, timeout: float = TIMEOUT) -> Measurement:
+    """Measure the mirror's connect latency and throughput."""
+
+    split = urlsplit(url)
+    request = Request(
+        database_url(url, repo), headers={"Range": f"bytes=0-{SAMPLE_SIZE - 1}"}
+    )
+
+    try:
+        start = perf_counter()
+        create_connection((split.hostname, split.port or 80), timeout).close()
+        latency = perf_counter() - start
+        start = perf_counter()
+
+        with urlopen(request, timeout=timeout) as response:
+            size = len(response.read(SAMPLE_SIZE))
+
+        duration = perf_counter() - start
+    except OSError as error:
+        LOGGER.debug("Mirror %s failed: %s", url, error)
+        return Measurement(url, error=str(error))
+
+    if not size:
+        return Measurement(url, latency, error="empty response")
+
+    return Measurement(url, latency, size / duration)
+
+
+def rank(
+    urls: Iterable[str], repo: str = REPO, *, timeout: float = TIMEOUT
+) -> list[Measurement]:
+    """Measure the mirrors concurrently and return them fastest first.
+
+    Unreachable mirrors come last.
+    """
+
+    urls = list(urls)
+
+    with ThreadPoolExecutor(max_workers=len(urls) or 1) as executor:
+        measurements = executor.map(lambda url: measure(url, repo, timeout), urls)
+
+    return sorted(
+        measurements,
+        key=lambda measurement: (measurement.score is None, measurement.score or 0),
+    )
+
+
+def get_path(repo: str, path: Path) -> str:
+    """Return the path of the repository on its current server."""
+
+    for url in read_servers(repo, path=path):
+        if match := fullmatch(URL_PATTERN, url):
+            return match.group(1)
+
+    raise ProgramError(f"No HTTP server configured for repository {repo}.")
+
+
+@traced("rank mirrors")
+def rerank(
+    repo: str = REPO,
+    *,
+    candidates_file: Path | None = None,
+    path: Path | None = None,
+    timeout: float = TIMEOUT,
+    dry_run: bool = False,
+) -> list[Measurement]:
+    """Rank the candidate mirrors and set them as the repository's servers.
+
+    The servers are left alone if no mirror is reachable.
+    The VPN server is kept as last resort if it is unreachable.
+    """
+
+    path = path or PACMAN_CONF
+    repo_path = get_path(repo, path)
+    urls = [f"http://{host}/{repo_path}" for host in candidates(candidates_file)]
+    measurements = rank(urls, repo, timeout=timeout)
+    servers = [m.url for m in measurements if m.score is not None]
+
+    if not servers:
+        LOGGER.warning("No mirror reachable, keeping the servers.")
+        return measurements
+
+    if urls[0] not in servers:
+        servers.append(urls[0])
+
+    if dry_run:
+        return measurements
+
+    if (text := render_servers(repo, servers, path=path)) != path.read_text(
+        encoding="ascii"
+    ):
+        LOGGER.info("Setting %i servers, fastest: %s", len(servers), servers[0])
+
+        with path.open("w", encoding="ascii") as file:
+            file.write(text)
+
+    return measurements
+
+
+def rows(measurements: Iterable[Measurement]) -> Iterator[tuple[str, str]]:
+    """Yield table rows of the measurements."""
+
+    yield "Mirror", "Latency / throughput / score"
+
+    for measurement in measurements:
+        if measurement.score is None:
+            yield measurement.url, f"✗ {measurement.error}"
+            continue
+
+        yield measurement.url, (
+            f"{measurement.latency * 1000:.1f} ms / "
+            f"{measurement.throughput / 1024:.0f} KiB/s / "
+            f"{measurement.score:.3f} s"
+        )
@@ -6,44 +6,60 @@ from pathlib import Path
 from re import fullmatch, sub
 from typing import Callable, Iterable, Iterator
 
+from hidslcfg.trace import traced
 
-__all__ = ["set_server"]
+
+__all__ = [
+    "PACMAN_CONF",
+    "read_servers",
+    "render_server",
+    "render_servers",
+    "set_server",
+]
 
 
 PACMAN_CONF = Path("/etc/pacman.conf")
 URL_PATTERN = "(http://).*(:8080/)"
 SECTION_PATTERN = r"^\[(.*)\]"
+SERVER_PATTERN = r"Server\s*=\s*(.*)"
 
 
-def read_lines() -> Iterator[str]:
+def read_lines(path: Path | None = None) -> Iterator[str]:
     """Reads the file's lines."""
 
-    with PACMAN_CONF.open("r", encoding="ascii") as file:
+    with (path or PACMAN_CONF).open("r", encoding="ascii") as file:
         for line in file:
             yield line.strip()
 
 
-def read_lines_with_section() -> Iterator[tuple[str | None, str]]:
+def read_lines_with_section(
+    path: Path | None = None,
+) -> Iterator[tuple[str | None, str]]:
     """Yields lines with section names."""
 
     section = None
 
-    for line in read_lines():
+    for line in read_lines(path):
         if match := fullmatch(SECTION_PATTERN, line):
             section = match.group(1)
 
         yield section, line
 
 
+def render_lines(lines: Iterable[str]) -> str:
+    """Returns the text of the file."""
+
+    return linesep.join(lines) + linesep
+
+
 def write_lines(lines: Iterable[str]) -> None:
     """Writes the lines to the file."""
 
     # Generate text before opening the file to prevent r/w race condition.
-    text = linesep.join(lines)
+    text = render_lines(lines)
 
     with PACMAN_CONF.open("w", encoding="ascii") as file:
         file.write(text)
-        file.write(linesep)
 
 
 def get_modifier(repo: str, address: IPv4Address | IPv6Address) -> Callable:
@@ -64,7 +80,67 @@ def get_modifier(repo: str, address: IPv4Address | IPv6Address) -> Callable:
     return modifier
 
 
+def unique_servers(
+    repo: str, items: Iterable[tuple[str | None, str]], modifier: Callable
+) -> Iterator[str]:
+    """Yields the modified lines without duplicate servers of the repo."""
+
+    servers = set()
+
+    for section, line in items:
+        line = modifier((section, line))
+
+        if section == repo and fullmatch(SERVER_PATTERN, line):
+            if line in servers:
+                continue
+
+            servers.add(line)
+
+        yield line
+
+
+def render_server(
+    repo: str, address: IPv4Address | IPv6Address, *, path: Path | None = None
+) -> str:
+    """Returns the text of the file with the server of the respective repo set.
+
+    Ranked mirrors on the same port collapse into the one server.
+    """
+
+    lines = read_lines_with_section(path)
+    return render_lines(unique_servers(repo, lines, get_modifier(repo, address)))
+
+
+def read_servers(repo: str, *, path: Path | None = None) -> list[str]:
+    """Returns the server URLs of the respective repo."""
+
+    return [
+        match.group(1)
+        for section, line in read_lines_with_section(path)
+        if section == repo and (match := fullmatch(SERVER_PATTERN, line))
+    ]
+
+
+def render_servers(
+    repo: str, urls: Iterable[str], *, path: Path | None = None
+) -> str:
+    """Returns the text of the file with the servers of the repo replaced."""
+
+    lines, servers = [], [f"Server = {url}" for url in urls]
+
+    for section, line in read_lines_with_section(path):
+        if section == repo and fullmatch(SERVER_PATTERN, line):
+            lines.extend(servers)
+            servers = []
+        else:
+            lines.append(line)
+
+    return render_lines(lines)
+
+
+@traced("set server in /etc/pacman.conf")
 def set_server(repo: str, address: IPv4Address | IPv6Address) -> None:
     """Sets the server of the respective repo."""
 
-    write_lines(map(get_modifier(repo, address), read_lines_with_section()))
+    lines = read_lines_with_section()
+    write_lines(unique_servers(repo, lines, get_modifier(repo, address)))
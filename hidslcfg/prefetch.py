@@ -0,0 +1,221 @@
+"""Prefetching of pending package updates.
+
+The sync databases are fetched into a temporary database directory, as
+checkupdates does, so that the system's databases stay consistent with
+the installed packages. The pending packages and their signatures are
+then downloaded into pacman's cache with a bounded amount of parallel
+downloads and a shared bandwidth limit, without installing them.
+
+Setup schedules the prefetch as a low priority service, so that it
+neither delays the setup nor is lost by the subsequent reboot. The
+service disables itself once the prefetch ran.
+"""
+
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from os import replace
+from pathlib import Path
+from subprocess import CalledProcessError, PIPE, run
+from tempfile import TemporaryDirectory
+from threading import Lock
+from time import monotonic, sleep
+from urllib.error import HTTPError
+from urllib.parse import unquote, urlsplit
+from urllib.request import urlopen
+
+from hidslcfg.common import LOGGER
+from hidslcfg.exceptions import ProgramError
+from hidslcfg.system import PACMAN_DB, system, systemctl
+from hidslcfg.trace import traced
+
+
+__all__ = [
+    "CACHE_DIR",
+    "JOBS",
+    "PREFETCH_SERVICE",
+    "RATE",
+    "RateLimiter",
+    "Summary",
+    "parse_rate",
+    "prefetch",
+    "schedule",
+]
+
+
+CACHE_DIR = Path("/var/cache/pacman/pkg")
+CHUNK_SIZE = 64 * 1024  # bytes
+JOBS = 2
+OPTIONS_FILE = Path("/etc/hidslcfg/prefetch")
+PACMAN = Path("/usr/bin/pacman")
+PREFETCH_SERVICE = "hidslcfg-prefetch.service"
+RATE = 1024 * 1024  # bytes per second
+TIMEOUT = 30  # seconds
+UNITS = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3}
+
+
+@dataclass(frozen=True)
+class Summary:
+    """Result of a prefetch."""
+
+    packages: int
+    downloaded: int  # bytes
+    failed: int
+
+
+class RateLimiter:
+    """A token bucket shared by all downloads."""
+
+    def __init__(self, rate: int | None):
+        self.rate = rate
+        self.tokens = float(rate or 0)
+        self.timestamp = monotonic()
+        self.lock = Lock()
+
+    def acquire(self, amount: int) -> None:
+        """Wait until the amount of bytes may be transferred."""
+        if not self.rate:
+            return
+
+        with self.lock:
+            now = monotonic()
+            self.tokens = min(
+                self.rate, self.tokens + (now - self.timestamp) * self.rate
+            )
+            self.timestamp = now
+            self.tokens -= amount
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0
+
+        if delay:
+            sleep(delay)
+
+
+def parse_rate(value: str) -> int | None:
+    """Parses a rate like 512K or 2M in bytes per second, where 0 is unlimited."""
+
+    value = value.strip().upper().removesuffix("B")
+
+    if value[-1:] in UNITS:
+        value, unit = value[:-1], value[-1]
+    else:
+        unit = ""
+
+    return int(float(value) * UNITS[unit]) or None
+
+
+def pending_urls() -> list[str]:
+    """Return the URLs of the pending package updates."""
+
+    with TemporaryDirectory() as dbpath:
+        (Path(dbpath) / "local").symlink_to(PACMAN_DB / "local")
+        system(PACMAN, "-Sy", "--dbpath", dbpath, "--logfile", "/dev/null")
+        result = run(
+            [
+                str(PACMAN),
+                "-Sup",
+                "--dbpath",
+                dbpath,
+                "--logfile",
+                "/dev/null",
+                "--print-format",
+                "%l",
+            ],
+            check=True,
+            stdout=PIPE,
+            text=True,
+        )
+
+    return [line for line in result.stdout.splitlines() if "://" in line]
+
+
+def download(url: str, path: Path, limiter: RateLimiter) -> int:
+    """Download the URL to the file and return the amount of bytes."""
+
+    tmp = path.with_name(f"{path.name}.part")
+    size = 0
+
+    try:
+        with urlopen(url, timeout=TIMEOUT) as response, tmp.open("wb") as file:
+            while chunk := response.read(CHUNK_SIZE):
+                limiter.acquire(len(chunk))
+                file.write(chunk)
+                size += len(chunk)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+    replace(tmp, path)
+    return size
+
+
+def fetch(url: str, cache_dir: Path, limiter: RateLimiter) -> int:
+    """Download a package and its signature unless cached."""
+
+    path = cache_dir / unquote(Path(urlsplit(url).path).name)
+
+    if path.exists():
+        return 0
+
+    size = download(url, path, limiter)
+
+    try:
+        size += download(f"{url}.sig", path.with_name(f"{path.name}.sig"), limiter)
+    except HTTPError as error:
+        LOGGER.debug("No signature for %s: %s", path.name, error)
+
+    return size
+
+
+@traced("prefetch updates")
+def prefetch(
+    *, jobs: int = JOBS, rate: int | None = RATE, cache_dir: Path = CACHE_DIR
+) -> Summary:
+    """Download the pending package updates without installing them."""
+
+    LOGGER.info("Determining pending package updates.")
+
+    try:
+        urls = pending_urls()
+    except CalledProcessError as error:
+        raise ProgramError("Could not determine pending updates.") from error
+
+    limiter = RateLimiter(rate)
+    downloaded = failed = 0
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = {executor.submit(fetch, url, cache_dir, limiter): url for url in urls}
+
+        for done, future in enumerate(as_completed(futures), start=1):
+            name = Path(urlsplit(futures[future]).path).name
+
+            try:
+                downloaded += future.result()
+            except OSError as error:
+                LOGGER.warning("Could not prefetch %s: %s", name, error)
+                failed += 1
+                continue
+
+            LOGGER.info(
+                "Prefetched %i / %i packages (%.1f MiB): %s",
+                done,
+                len(urls),
+                downloaded / 1024**2,
+                name,
+                extra={"STAGE": "PREFETCH"},
+            )
+
+    return Summary(len(urls), downloaded, failed)
+
+
+def schedule(*, jobs: int = JOBS, rate: int | None = RATE) -> None:
+    """Start the prefetch service in the background.
+
+    The service is enabled, so that it runs again after a reboot if it
+    is interrupted.
+    """
+
+    OPTIONS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    OPTIONS_FILE.write_text(
+        f"OPTIONS=--jobs {jobs} --rate {rate or 0}\n", encoding="utf-8"
+    )
+    systemctl("enable", "--now", "--no-block", PREFETCH_SERVICE)
@@ -0,0 +1,127 @@
+"""Progress reporting of the setup steps."""
+
+from __future__ import annotations
+from contextlib import contextmanager
+from dataclasses import dataclass
+from enum import Enum, auto
+from queue import Empty, SimpleQueue
+from time import monotonic
+from typing import Callable, Iterator
+
+from hidslcfg.cancel import CancellationToken
+from hidslcfg.common import LOGGER
+from hidslcfg.trace import span
+
+
+__all__ = ["Progress", "ProgressEvent", "QueueProgress", "State", "Step"]
+
+
+class Step(Enum):
+    """Setup steps in order of their execution."""
+
+    KEYPAIR = "create key pair"
+    API = "register system"
+    HOSTNAME = "set host name"
+    HOSTS = "update /etc/hosts"
+    PACMAN = "update /etc/pacman.conf"
+    SERVICES = "configure services"
+    UNITS = "write WireGuard units"
+    NETWORKD = "restart systemd-networkd"
+    READINESS = "contact VPN server"
+
+
+class State(Enum):
+    """Step states."""
+
+    STARTED = auto()
+    COMPLETED = auto()
+    FAILED = auto()
+
+
+@dataclass(frozen=True)
+class ProgressEvent:
+    """A change of a step's state."""
+
+    step: Step
+    state: State
+    timestamp: float
+    duration: float | None = None
+
+
+class Progress:
+    """Reports progress events to the log.
+
+    If a cancellation token is given, it is checked before each step.
+    """
+
+    def __init__(self, token: CancellationToken | None = None):
+        self.token = token
+
+    def emit(self, event: ProgressEvent) -> None:
+        """Handle a progress event."""
+        if event.state is State.STARTED:
+            LOGGER.debug(
+                "Step started: %s.", event.step.value, extra={"STAGE": event.step.name}
+            )
+        else:
+            LOGGER.debug(
+                "Step %s after %.3f s: %s.",
+                event.state.name.lower(),
+                event.duration,
+                event.step.value,
+                extra={
+                    "STAGE": event.step.name,
+                    "DURATION_MS": round(event.duration * 1000),
+                },
+            )
+
+    @contextmanager
+    def step(self, step: Step) -> Iterator[None]:
+        """Report the start and completion or failure of a step."""
+        if self.token is not None:
+            self.token.check()
+
+        self.emit(ProgressEvent(step, State.STARTED, start := monotonic()))
+
+        try:
+            with span(step.value):
+                yield
+        except BaseException:
+            now = monotonic()
+            self.emit(ProgressEvent(step, State.FAILED, now, now - start))
+            raise
+
+        now = monotonic()
+        self.emit(ProgressEvent(step, State.COMPLETED, now, now - start))
+
+
+class QueueProgress(Progress):
+    """Puts progress events into a thread-safe queue."""
+
+    def __init__(
+        self,
+        on_emit: Callable[[], None] | None = None,
+        token: CancellationToken | None = None,
+    ):
+        """Set an optional callback to run after each emitted event."""
+        super().__init__(token)
+        self.queue: SimpleQueue[ProgressEvent] = SimpleQueue()
+        self.on_emit = on_emit
+
+    def emit(self, event: ProgressEvent) -> None:
+        """Queue the event."""
+        super().emit(event)
+        self.queue.put(event)
+
+        if self.on_emit is not None:
+            self.on_emit()
+
+    def drain(self) -> list[ProgressEvent]:
+        """Remove and return all queued events."""
+        events = []
+
+        while True:
+            try:
+                events.append(self.queue.get_nowait())
+            except Empty:
+                return events
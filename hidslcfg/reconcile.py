@@ -0,0 +1,316 @@
+"""Reconciliation of the system's configuration with a desired state.
+
+Resources know how to cheaply read their current state. Only resources
+whose current state differs from the desired state are applied and only
+the services depending on changed resources are restarted.
+"""
+
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from os import stat_result
+from pathlib import Path
+from subprocess import PIPE, run
+from typing import Iterable
+
+from hidslcfg.common import LOGGER, ROOT, rooted
+from hidslcfg.progress import Progress, Step
+from hidslcfg.rollback import Rollback
+from hidslcfg.system import (
+    HOSTNAME,
+    HOSTNAMECTL,
+    SYSTEMCTL,
+    chown,
+    get_gid,
+    get_hostname,
+    get_uid,
+    set_hostname,
+    systemctl,
+)
+
+
+__all__ = [
+    "Change",
+    "File",
+    "Hostname",
+    "Resource",
+    "Service",
+    "apply",
+    "log_plan",
+    "plan",
+    "unit_exists",
+]
+
+
+ENABLED_STATES = {"enabled", "enabled-runtime", "alias"}
+UNIT_DIRS = (Path("/etc/systemd/system"), Path("/usr/lib/systemd/system"))
+
+
+@dataclass
+class Resource(ABC):
+    """A configurable resource of the system."""
+
+    step: Step
+
+    @property
+    @abstractmethod
+    def name(self) -> str:
+        """Return the resource's name."""
+
+    @property
+    def restarts(self) -> frozenset[str]:
+        """Return the units to restart after the resource has changed."""
+        return frozenset()
+
+    @abstractmethod
+    def change(self) -> str | None:
+        """Return a description of the pending change or None if up to date."""
+
+    @abstractmethod
+    def apply(self, rollback: Rollback) -> None:
+        """Apply the desired state and register the undo action."""
+
+
+@dataclass
+class Hostname(Resource):
+    """The system's host name."""
+
+    hostname: str
+
+    @property
+    def name(self) -> str:
+        return "host name"
+
+    def change(self) -> str | None:
+        try:
+            current = get_hostname()
+        except FileNotFoundError:
+            current = None
+
+        if current == self.hostname:
+            return None
+
+        return f"{current} → {self.hostname}"
+
+    def apply(self, rollback: Rollback) -> None:
+        try:
+            current = get_hostname()
+        except FileNotFoundError:
+            rollback.snapshot(HOSTNAME)
+        else:
+            rollback.command("reset host name", HOSTNAMECTL, "set-hostname", current)
+
+        set_hostname(self.hostname)
+
+
+@dataclass
+class File(Resource):
+    """A file with its content and optionally ownership and mode.
+
+    Owner and group names are resolved within the root directory.
+    """
+
+    path: Path
+    content: str
+    owner: str | None = None
+    group: str | None = None
+    mode: int | None = None
+    units: frozenset[str] = field(default_factory=frozenset)
+    root: Path = ROOT
+
+    @property
+    def name(self) -> str:
+        return str(self.path)
+
+    @property
+    def restarts(self) -> frozenset[str]:
+        return self.units
+
+    def change(self) -> str | None:
+        try:
+            current = self.path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return "create"
+
+        if current != self.content:
+            return "update"
+
+        if self.mode is not None and self.path.stat().st_mode & 0o7777 != self.mode:
+            return f"change mode to {self.mode:o}"
+
+        if not self.owned(self.path.stat()):
+            return f"change owner to {self.owner}:{self.group}"
+
+        return None
+
+    def owned(self, stat: stat_result) -> bool:
+        """Check whether the file has the desired owner and group."""
+        if self.owner is not None and stat.st_uid != get_uid(self.owner, self.root):
+            return False
+
+        if self.group is not None and stat.st_gid != get_gid(self.group, self.root):
+            return False
+
+        return True
+
+    def apply(self, rollback: Rollback) -> None:
+        rollback.snapshot(self.path)
+
+        with self.path.open("w", encoding="utf-8") as file:
+            # Restrict access before writing possibly secret content.
+            if self.owner is not None or self.group is not None:
+                chown(
+                    self.path,
+                    -1 if self.owner is None else get_uid(self.owner, self.root),
+                    -1 if self.group is None else get_gid(self.group, self.root),
+                )
+
+            if self.mode is not None:
+                self.path.chmod(self.mode)
+
+            file.write(self.content)
+
+
+@dataclass
+class Service(Resource):
+    """Enablement of a systemd unit.
+
+    Outside of the running system, the unit is enabled within the root
+    directory by systemctl --root, which only manages the symlinks.
+    """
+
+    unit: str
+    enabled: bool
+    current: bool | None = None
+    root: Path = ROOT
+
+    @property
+    def name(self) -> str:
+        return self.unit
+
+    @property
+    def options(self) -> tuple[str, ...]:
+        """Return the options for systemctl."""
+        return () if self.root == ROOT else (f"--root={self.root}",)
+
+    def change(self) -> str | None:
+        if self.current is None:
+            self.current = is_enabled(self.unit, root=self.root)[self.unit]
+
+        if self.current == self.enabled:
+            return None
+
+        return "enable" if self.enabled else "disable"
+
+    def apply(self, rollback: Rollback) -> None:
+        action, undo = ("enable", "disable") if self.enabled else ("disable", "enable")
+        rollback.command(
+            f"{undo} {self.unit}", SYSTEMCTL, *self.options, undo, self.unit
+        )
+        systemctl(*self.options, action, self.unit)
+
+
+@dataclass(frozen=True)
+class Change:
+    """A pending change of a resource."""
+
+    resource: Resource
+    description: str
+
+
+def is_enabled(*units: str, root: Path = ROOT) -> dict[str, bool]:
+    """Query the enablement of several units with a single systemctl call."""
+
+    command = [str(SYSTEMCTL), "is-enabled", *units]
+
+    if root != ROOT:
+        command.insert(1, f"--root={root}")
+
+    result = run(command, stdout=PIPE, stderr=PIPE, text=True)
+
+    if len(states := result.stdout.split()) == len(units):
+        return {unit: state in ENABLED_STATES for unit, state in zip(units, states)}
+
+    # Unknown units have no output line, so query them individually.
+    if len(units) > 1:
+        return {unit: is_enabled(unit, root=root)[unit] for unit in units}
+
+    return {units[0]: False}
+
+
+def unit_exists(unit: str, *, root: Path = ROOT) -> bool:
+    """Check whether the unit file is installed within the root directory."""
+
+    return any(rooted(directory / unit, root).exists() for directory in UNIT_DIRS)
+
+
+def plan(resources: Iterable[Resource]) -> list[Change]:
+    """Return the changes required to reach the desired state."""
+
+    resources = list(resources)
+    services: dict[Path, list[Service]] = {}
+
+    for resource in resources:
+        if isinstance(resource, Service):
+            services.setdefault(resource.root, []).append(resource)
+
+    for root, group in services.items():
+        states = is_enabled(*(service.unit for service in group), root=root)
+
+        for service in group:
+            service.current = states[service.unit]
+
+    return [
+        Change(resource, description)
+        for resource in resources
+        if (description := resource.change()) is not None
+    ]
+
+
+def log_plan(changes: list[Change]) -> None:
+    """Log the plan."""
+
+    if not changes:
+        LOGGER.info("Configuration is up to date.")
+        return
+
+    LOGGER.info("Applying %i changes:", len(changes))
+
+    for change in changes:
+        LOGGER.info("%s: %s", change.resource.name, change.description)
+
+
+def apply(
+    changes: list[Change],
+    *,
+    steps: Iterable[Step] = (),
+    progress: Progress = Progress(),
+    rollback: Rollback | None = None,
+) -> set[str]:
+    """Apply the changes grouped by their steps.
+
+    Steps without changes are reported as well to keep the progress complete.
+    Returns the units that need to be restarted.
+    """
+
+    rollback = rollback or Rollback()
+    restarts: set[str] = set()
+    steps = list(dict.fromkeys([*steps, *(ch.resource.step for ch in changes)]))
+
+    for step in steps:
+        with progress.step(step):
+            for change in changes:
+                if change.resource.step is not step:
+                    continue
+
+                LOGGER.debug(
+                    "Applying %s: %s.", change.resource.name, change.description
+                )
+
+                for unit in change.resource.restarts - restarts:
+                    rollback.command(f"restart {unit}", SYSTEMCTL, "restart", unit)
+                    restarts.add(unit)
+
+                change.resource.apply(rollback)
+
+    return restarts
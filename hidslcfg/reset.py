@@ -1,23 +1,31 @@
 """Reset operations."""
 
 from functools import partial
+from os import chmod, chown
 from subprocess import CalledProcessError
 from typing import Callable, NamedTuple
+from uuid import uuid4
 
 from hidslcfg.common import APPLICATION_SERVICE
 from hidslcfg.common import CHROMIUM_SERVICE
 from hidslcfg.common import DIGSIG_DATA_DIR
+from hidslcfg.common import DIGSIG_TRASH_DIR
 from hidslcfg.common import HTML5DS
 from hidslcfg.common import INSTALLATION_INSTRUCTIONS_SERVICE
+from hidslcfg.common import LOGGER
 from hidslcfg.common import UNCONFIGURED_WARNING_SERVICE
 from hidslcfg.exceptions import ProgramError
 from hidslcfg.system import systemctl, set_hostname, rmsubtree
+from hidslcfg.trace import span
 from hidslcfg.wireguard.disable import remove
 
 
 __all__ = ["reset"]
 
 
+PURGE_SERVICE = "hidslcfg-purge.service"
+
+
 class ResetOperation(NamedTuple):
     """A reset operation."""
 
@@ -35,10 +43,38 @@ def gracefully_disable_service(service: str) -> None:
             raise
 
 
+def trash_digsig_data() -> None:
+    """Replaces the digital signage data with an empty directory.
+
+    The data is moved to the trash, which is purged after the next boot.
+    If it cannot be moved, e.g. because it is a mount point, it is removed
+    in place.
+    """
+
+    if not DIGSIG_DATA_DIR.exists():
+        return
+
+    stat = DIGSIG_DATA_DIR.stat()
+    DIGSIG_TRASH_DIR.mkdir(mode=0o700, exist_ok=True)
+
+    try:
+        DIGSIG_DATA_DIR.rename(DIGSIG_TRASH_DIR / uuid4().hex)
+    except OSError as error:
+        LOGGER.warning("Cannot move data to trash, removing it: %s", error)
+        rmsubtree(DIGSIG_DATA_DIR)
+        return
+
+    # The mode passed to mkdir() is subject to the umask.
+    DIGSIG_DATA_DIR.mkdir()
+    chown(DIGSIG_DATA_DIR, stat.st_uid, stat.st_gid)
+    chmod(DIGSIG_DATA_DIR, stat.st_mode & 0o7777)
+    systemctl("enable", PURGE_SERVICE)
+
+
 # Oder matters here!
 RESET_OPERATIONS = (
     ResetOperation("reset hostname", partial(set_hostname, "unconfigured")),
-    ResetOperation("remove digital signage data", partial(rmsubtree, DIGSIG_DATA_DIR)),
+    ResetOperation("remove digital signage data", trash_digsig_data),
     ResetOperation("remove WireGuard configuration", remove),
     ResetOperation(
         "disable application", partial(gracefully_disable_service, APPLICATION_SERVICE)
@@ -58,11 +94,22 @@ RESET_OPERATIONS = (
 )
 
 
-def reset() -> None:
-    """Resets the system's configuration."""
+def reset(*, purge_now: bool = False) -> None:
+    """Resets the system's configuration.
+
+    Unless purge_now is set, the digital signage data is purged in the
+    background after the next boot.
+    """
 
     for description, function in RESET_OPERATIONS:
         try:
-            function()
+            with span(description):
+                function()
         except CalledProcessError:
             raise ProgramError(f"Could not {description}.") from None
+
+    if purge_now:
+        LOGGER.info("Purging digital signage data.")
+
+        with span("purge digital signage data"):
+            rmsubtree(DIGSIG_TRASH_DIR)
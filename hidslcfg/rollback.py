@@ -0,0 +1,54 @@
+"""Rollback of applied local configuration changes."""
+
+from contextlib import suppress
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable
+
+from hidslcfg.common import LOGGER
+from hidslcfg.system import system
+
+
+__all__ = ["Rollback"]
+
+
+class Rollback:
+    """Undoes registered changes in reverse order."""
+
+    def __init__(self):
+        self.actions: list[tuple[str, Callable[[], Any]]] = []
+
+    def push(self, description: str, action: Callable[[], Any]) -> None:
+        """Register an action to undo a change that is about to be made."""
+        self.actions.append((description, action))
+
+    def command(self, description: str, *args: Any) -> None:
+        """Register a command to undo a change that is about to be made."""
+        self.push(description, partial(system, *args))
+
+    def snapshot(self, path: Path) -> None:
+        """Register the restoration of the file's current content."""
+        try:
+            content = path.read_bytes()
+        except FileNotFoundError:
+            self.push(f"remove {path}", partial(remove, path))
+        else:
+            self.push(f"restore {path}", partial(path.write_bytes, content))
+
+    def run(self) -> None:
+        """Undo all registered changes."""
+        while self.actions:
+            description, action = self.actions.pop()
+            LOGGER.info("Rolling back: %s.", description)
+
+            try:
+                action()
+            except Exception as error:
+                LOGGER.error("Could not %s: %s", description, error)
+
+
+def remove(path: Path) -> None:
+    """Remove a file if it exists."""
+
+    with suppress(FileNotFoundError):
+        path.unlink()
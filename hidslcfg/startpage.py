@@ -0,0 +1,222 @@
+"""DDB OS start pages.
+
+Every *.html.template file in the template directory is rendered into the
+web root, e.g. index.html.template into /srv/index.html. The templates are
+str.format() templates with the variables of get_context().
+
+This module is run at boot time and thus only has lightweight imports.
+The rendering state is recorded, so that neither a template is rendered
+nor a page is written unless the template, the context or the page changed.
+"""
+
+from __future__ import annotations
+from hashlib import sha256
+from json import dumps, loads
+from os import chmod, chown, replace
+from pathlib import Path
+from string import Formatter
+from typing import Any, NamedTuple
+
+from hidslcfg.common import DDBOSSTART, DDBOSSTART_TEMPLATE, LOGGER, ROOT
+from hidslcfg.common import STATE_DIR, rooted
+from hidslcfg.system import get_product_name, get_serial_number, get_system_id
+from hidslcfg.system import is_ddb_os_system
+from hidslcfg.trace import traced
+from hidslcfg.wireguard.common import DEVNAME
+
+
+__all__ = [
+    "STATE_FILE",
+    "Page",
+    "build",
+    "create_ddbos_start",
+    "get_context",
+    "pages",
+]
+
+
+FORMATTER = Formatter()
+NET_DIR = Path("/sys/class/net")
+STATE_FILE = STATE_DIR / "startpage.json"
+TEMPLATE_DIR = DDBOSSTART_TEMPLATE.parent
+TEMPLATE_SUFFIX = ".template"
+# Literal text, field name, format spec and conversion.
+Segment = tuple[str, str | None, str | None, str | None]
+CACHE: dict[Path, tuple[int, list[Segment]]] = {}
+
+
+class Page(NamedTuple):
+    """A template and the page rendered from it."""
+
+    template: Path
+    output: Path
+
+    def render(self, context: dict[str, Any]) -> str:
+        """Render the page."""
+        return render(compile_template(self.template), context)
+
+
+def pages(*, root: Path = ROOT) -> list[Page]:
+    """Return the pages of the templates in the template directory."""
+
+    output_dir = rooted(DDBOSSTART.parent, root)
+    return [
+        Page(template, output_dir / template.name.removesuffix(TEMPLATE_SUFFIX))
+        for template in sorted(
+            rooted(TEMPLATE_DIR, root).glob(f"*.html{TEMPLATE_SUFFIX}")
+        )
+    ]
+
+
+def get_context(system: int, *, root: Path = ROOT) -> dict[str, Any]:
+    """Return the template variables.
+
+    The hardware and network state is only known for the running system.
+    """
+
+    if root != ROOT:
+        return {"system": system, "model": "", "serial_number": "", "vpn": ""}
+
+    return {
+        "system": system,
+        "model": get_product_name() or "",
+        "serial_number": get_serial_number() or "",
+        "vpn": get_link_state(DEVNAME),
+    }
+
+
+def get_link_state(interface: str) -> str:
+    """Return the operational state of a network interface."""
+
+    try:
+        return (NET_DIR / interface / "operstate").read_text().strip()
+    except FileNotFoundError:
+        return "absent"
+
+
+def compile_template(path: Path) -> list[Segment]:
+    """Return the parsed template, cached by its modification time."""
+
+    mtime = path.stat().st_mtime_ns
+
+    if (cached := CACHE.get(path)) is not None and cached[0] == mtime:
+        return cached[1]
+
+    with path.open(encoding="utf-8") as file:
+        segments = list(FORMATTER.parse(file.read()))
+
+    CACHE[path] = (mtime, segments)
+    return segments
+
+
+def render(segments: list[Segment], context: dict[str, Any]) -> str:
+    """Render a parsed template."""
+
+    parts = []
+
+    for literal, field, spec, conversion in segments:
+        parts.append(literal)
+
+        if field is not None:
+            value, _ = FORMATTER.get_field(field, (), context)
+            value = FORMATTER.convert_field(value, conversion)
+            parts.append(FORMATTER.format_field(value, spec or ""))
+
+    return "".join(parts)
+
+
+def digest(content: bytes) -> str:
+    """Return the hash of a page."""
+
+    return sha256(content).hexdigest()
+
+
+def get_mtime(path: Path) -> int | None:
+    """Return the modification time of a file or None if it does not exist."""
+
+    try:
+        return path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def load_state(path: Path) -> dict[str, Any]:
+    """Load the recorded rendering state."""
+
+    try:
+        return loads(path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def write(path: Path, content: bytes) -> None:
+    """Atomically replace the file's content, keeping its mode and owner."""
+
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_bytes(content)
+
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        pass
+    else:
+        chmod(tmp, stat.st_mode & 0o7777)
+        chown(tmp, stat.st_uid, stat.st_gid)
+
+    replace(tmp, path)
+
+
+def build(
+    context: dict[str, Any], *, root: Path = ROOT, state_file: Path = STATE_FILE
+) -> list[Path]:
+    """Render the pages that may have changed and write those that did.
+
+    Returns the paths of the written pages.
+    """
+
+    state_file = rooted(state_file, root)
+    state = load_state(state_file)
+    context_hash = digest(dumps(context, sort_keys=True).encode())
+    written, records = [], {}
+
+    for page in pages(root=root):
+        record = state.get(str(page.output), {})
+        source = {"template": get_mtime(page.template), "context": context_hash}
+
+        if record.get("source") == source and record.get("mtime") == get_mtime(
+            page.output
+        ):
+            records[str(page.output)] = record
+            continue
+
+        content = page.render(context).encode("utf-8")
+
+        try:
+            current = digest(page.output.read_bytes())
+        except FileNotFoundError:
+            current = None
+
+        if (new := digest(content)) != current:
+            write(page.output, content)
+            written.append(page.output)
+
+        records[str(page.output)] = {
+            "source": source,
+            "mtime": get_mtime(page.output),
+            "sha256": new,
+        }
+
+    if records != state:
+        state_file.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        state_file.write_text(dumps(records, indent=2), encoding="utf-8")
+
+    return written
+
+
+@traced("create start page")
+def create_ddbos_start() -> None:
+    """Creates the DDB OS start pages."""
+
+    if is_ddb_os_system():
+        for path in build(get_context(get_system_id())):
+            LOGGER.info("Updated %s.", path)
@@ -10,8 +10,9 @@ from subprocess import DEVNULL, CalledProcessError, CompletedProcess, check_call
 from sys import exit
 from typing import Any
 
-from hidslcfg.common import DDB_OS_PKG_NAME, LOGGER
+from hidslcfg.common import DDB_OS_PKG_NAME, LOGGER, ROOT, rooted
 from hidslcfg.exceptions import ProgramError
+from hidslcfg.trace import span
 
 
 __all__ = [
@@ -23,8 +24,14 @@ __all__ = [
     "reboot",
     "rmsubtree",
     "set_hostname",
+    "get_hostname",
+    "get_product_name",
+    "get_serial_number",
     "get_system_id",
+    "get_gid",
+    "get_uid",
     "is_ddb_os_system",
+    "read_dmi",
     "CalledProcessErrorHandler",
     "ProgramErrorHandler",
     "SystemdUnit",
@@ -32,7 +39,12 @@ __all__ = [
 
 
 HOSTNAME = Path("/etc/hostname")
+PRODUCT_NAME = Path("/sys/class/dmi/id/product_name")
+PRODUCT_SERIAL = Path("/sys/class/dmi/id/product_serial")
 HOSTNAMECTL = Path("/usr/bin/hostnamectl")
+GROUP = Path("/etc/group")
+PACMAN_DB = Path("/var/lib/pacman")
+PASSWD = Path("/etc/passwd")
 PING = Path("/usr/bin/ping")
 SYSTEMCTL = Path("/usr/bin/systemctl")
 efi_booted = Path("/sys/firmware/efi").is_dir
@@ -56,17 +68,60 @@ def chown(
             chown(child, uid, gid, recursive=recursive)
 
 
+def get_uid(user: int | str, root: Path = ROOT) -> int:
+    """Returns the user ID of a user of the system in the root directory."""
+
+    if isinstance(user, int):
+        return user
+
+    if root == ROOT:
+        return getpwnam(user).pw_uid
+
+    return lookup(rooted(PASSWD, root), user)
+
+
+def get_gid(group: int | str, root: Path = ROOT) -> int:
+    """Returns the group ID of a group of the system in the root directory."""
+
+    if isinstance(group, int):
+        return group
+
+    if root == ROOT:
+        return getgrnam(group).gr_gid
+
+    return lookup(rooted(GROUP, root), group)
+
+
+def lookup(database: Path, name: str) -> int:
+    """Returns the ID of a name from a passwd(5) or group(5) file."""
+
+    with database.open("r", encoding="utf-8") as file:
+        for line in file:
+            if (fields := line.split(":"))[0] == name:
+                return int(fields[2])
+
+    raise ProgramError(f"No entry for {name} in {database}.")
+
+
 def system(*args: Any) -> CompletedProcess:
     """Invoke system commands."""
 
     output = DEVNULL if LOGGER.getEffectiveLevel() > DEBUG else None
-    return run(tuple(map(str, args)), check=True, stdout=output, stderr=output)
+    command = tuple(map(str, args))
+
+    with span(" ".join((Path(command[0]).name, *command[1:]))):
+        return run(command, check=True, stdout=output, stderr=output)
 
 
-def ping(host: str, timeout: int = 1, count: int = 5) -> CompletedProcess:
+def ping(
+    host: str, timeout: int = 1, count: int = 5, *, deadline: int | None = None
+) -> CompletedProcess:
     """Pings the respective host."""
 
-    return system(PING, "-W", timeout, "-c", count, host)
+    if deadline is None:
+        return system(PING, "-W", timeout, "-c", count, host)
+
+    return system(PING, "-W", timeout, "-c", count, "-w", deadline, host)
 
 
 def systemctl(*args: Any) -> CompletedProcess:
@@ -101,18 +156,54 @@ def set_hostname(hostname: str) -> CompletedProcess:
     return system(HOSTNAMECTL, "set-hostname", hostname)
 
 
+def get_hostname() -> str:
+    """Returns the configured host name."""
+
+    with HOSTNAME.open("r", encoding="ascii") as file:
+        return file.read().strip()
+
+
+def get_product_name() -> str | None:
+    """Returns the hardware's product name."""
+
+    return read_dmi(PRODUCT_NAME)
+
+
+def get_serial_number() -> str | None:
+    """Returns the hardware's serial number."""
+
+    return read_dmi(PRODUCT_SERIAL)
+
+
+def read_dmi(path: Path) -> str | None:
+    """Returns the value of a DMI attribute."""
+
+    try:
+        value = path.read_text(encoding="ascii").strip()
+    except (FileNotFoundError, PermissionError, UnicodeDecodeError):
+        return None
+
+    return value or None
+
+
 def get_system_id() -> int:
     """Returns the system id."""
 
-    with HOSTNAME.open("r", encoding="ascii") as file:
-        return int(file.read().strip())
+    return int(get_hostname())
 
 
-def is_ddb_os_system(*, pkg_name: str = DDB_OS_PKG_NAME) -> bool:
+def is_ddb_os_system(
+    *, pkg_name: str = DDB_OS_PKG_NAME, root: Path = ROOT
+) -> bool:
     """Determines whether this is a new "DDB OS" type system."""
 
+    command = ["pacman", "-Q", pkg_name]
+
+    if root != ROOT:
+        command[1:1] = ["--dbpath", str(rooted(PACMAN_DB, root))]
+
     try:
-        check_call(["pacman", "-Q", pkg_name], stdout=DEVNULL, stderr=DEVNULL)
+        check_call(command, stdout=DEVNULL, stderr=DEVNULL)
     except CalledProcessError:
         return False
 
@@ -8,7 +8,7 @@ from typing import Iterator, Iterable
 from hidslcfg.exceptions import ProgramError
 
 
-__all__ = ["ask", "bold", "read_credentials", "Table"]
+__all__ = ["ask", "bold", "read_credentials", "read_token", "Table"]
 
 
 YES_VALUES = {"y", "yes"}
@@ -59,6 +59,19 @@ def read_credentials(user: str) -> tuple[str, str]:
     return user, passwd
 
 
+def read_token() -> str:
+    """Reads a provisioning token."""
+
+    try:
+        return getpass("Provisioning token: ")
+    except EOFError:
+        print()
+        raise ProgramError("Missing mandatory data.") from None
+    except KeyboardInterrupt:
+        print()
+        raise ProgramError("Configuration aborted by user.") from None
+
+
 class Table(Enum):
     """Table elements."""
 
@@ -0,0 +1,173 @@
+"""Timing instrumentation.
+
+Spans are only recorded if tracing has been enabled.
+Otherwise they cost little more than an attribute lookup.
+"""
+
+from __future__ import annotations
+from contextlib import nullcontext
+from functools import wraps
+from json import dump
+from os import getpid
+from pathlib import Path
+from threading import Lock, get_ident
+from time import perf_counter
+from typing import Any, Callable, ContextManager, Iterable, Iterator, NamedTuple
+
+from hidslcfg.common import LOGGER
+from hidslcfg.termio import Table
+
+
+__all__ = ["TRACER", "Span", "Tracer", "report", "span", "traced"]
+
+
+NULL_CONTEXT = nullcontext()
+
+
+class Span(NamedTuple):
+    """A timed operation."""
+
+    name: str
+    start: float
+    duration: float
+    thread: int
+    args: dict[str, Any]
+
+    def to_chrome_trace_event(self, pid: int) -> dict[str, Any]:
+        """Return a complete event of the Chrome trace event format."""
+        return {
+            "name": self.name,
+            "ph": "X",
+            "ts": self.start * 1_000_000,
+            "dur": self.duration * 1_000_000,
+            "pid": pid,
+            "tid": self.thread,
+            "args": self.args,
+        }
+
+
+class Tracer:
+    """Records spans."""
+
+    def __init__(self):
+        self.enabled = False
+        self.spans: list[Span] = []
+        self.lock = Lock()
+
+    def enable(self) -> None:
+        """Enable recording of spans."""
+        self.enabled = True
+
+    def add(self, span_: Span) -> None:
+        """Add a finished span."""
+        LOGGER.debug(
+            "%s took %.3f s.",
+            span_.name,
+            span_.duration,
+            extra={"SPAN": span_.name, "DURATION_MS": round(span_.duration * 1000)},
+        )
+
+        with self.lock:
+            self.spans.append(span_)
+
+    def write_chrome_trace(self, path: Path) -> None:
+        """Write the recorded spans as Chrome trace JSON file."""
+        pid = getpid()
+
+        with self.lock:
+            events = [span_.to_chrome_trace_event(pid) for span_ in self.spans]
+
+        with path.open("w", encoding="utf-8") as file:
+            dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+
+    def summary(self) -> Iterator[tuple[str, str]]:
+        """Yield table rows with the total time per span name."""
+        totals: dict[str, list[float]] = {}
+
+        with self.lock:
+            for span_ in self.spans:
+                totals.setdefault(span_.name, []).append(span_.duration)
+
+        yield "Span", "Time"
+
+        for name, durations in sorted(
+            totals.items(), key=lambda item: sum(item[1]), reverse=True
+        ):
+            yield name, format_durations(durations)
+
+
+class SpanContext:
+    """Context manager to record a span."""
+
+    def __init__(self, tracer: Tracer, name: str, args: dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.start = 0.0
+
+    def __enter__(self) -> SpanContext:
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, typ, value, traceback):
+        duration = perf_counter() - self.start
+
+        if value is not None:
+            self.args["error"] = type(value).__name__
+
+        self.tracer.add(Span(self.name, self.start, duration, get_ident(), self.args))
+
+
+TRACER = Tracer()
+
+
+def span(name: str, **args: Any) -> ContextManager:
+    """Return a context manager recording a span, if tracing is enabled."""
+
+    if not TRACER.enabled:
+        return NULL_CONTEXT
+
+    return SpanContext(TRACER, name, args)
+
+
+def traced(name: str) -> Callable[[Callable], Callable]:
+    """Decorate a function to record a span for each call."""
+
+    def decorator(function: Callable) -> Callable:
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if not TRACER.enabled:
+                return function(*args, **kwargs)
+
+            with SpanContext(TRACER, name, {}):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def report(path: Path | None = None) -> None:
+    """Print a summary of the recorded spans and optionally write a trace file."""
+
+    if not TRACER.enabled:
+        return
+
+    print(flush=True)
+    print(Table.generate(TRACER.summary()))
+
+    if path is not None:
+        TRACER.write_chrome_trace(path)
+        LOGGER.info("Trace written to %s.", path)
+
+
+def format_durations(durations: Iterable[float]) -> str:
+    """Format the total, count and maximum of durations."""
+
+    durations = list(durations)
+    total = sum(durations)
+
+    if len(durations) == 1:
+        return f"{total:.3f} s"
+
+    return f"{total:.3f} s ({len(durations)}×, max. {max(durations):.3f} s)"
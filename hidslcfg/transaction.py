@@ -0,0 +1,147 @@
+"""Journaled transactions over the files and commands touched by setup.
+
+Before a managed file is written for the first time, its content, mode and
+ownership are recorded in a compressed journal on disk. The journal outlives
+the process, so an interrupted or unwanted setup can be undone later on via
+hidslreset --rollback.
+"""
+
+from __future__ import annotations
+from base64 import b64decode, b64encode
+from contextlib import suppress
+from dataclasses import asdict, dataclass
+from functools import partial
+from gzip import compress, decompress
+from json import dumps, loads
+from os import O_CREAT, O_TRUNC, O_WRONLY, chown, fdopen, open as os_open, replace
+from pathlib import Path
+from typing import Any
+
+from hidslcfg.common import LOGGER, STATE_DIR
+from hidslcfg.exceptions import ProgramError
+from hidslcfg.rollback import Rollback
+from hidslcfg.system import system
+
+
+__all__ = ["JOURNAL", "FileState", "Transaction", "rollback"]
+
+
+JOURNAL = STATE_DIR / "journal.json.gz"
+
+
+@dataclass
+class FileState:
+    """The state of a file before it was changed."""
+
+    path: str
+    content: str | None = None
+    mode: int | None = None
+    uid: int | None = None
+    gid: int | None = None
+
+    @classmethod
+    def read(cls, path: Path) -> FileState:
+        """Record the file's current state."""
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return cls(str(path))
+
+        return cls(
+            str(path),
+            b64encode(path.read_bytes()).decode(),
+            stat.st_mode & 0o7777,
+            stat.st_uid,
+            stat.st_gid,
+        )
+
+    def restore(self) -> None:
+        """Restore the recorded state."""
+        path = Path(self.path)
+
+        if self.content is None:
+            with suppress(FileNotFoundError):
+                path.unlink()
+
+            return
+
+        tmp = path.with_name(f".{path.name}.rollback")
+
+        with fdopen(os_open(tmp, O_WRONLY | O_CREAT | O_TRUNC, 0o600), "wb") as file:
+            chown(file.fileno(), self.uid, self.gid)
+            file.write(b64decode(self.content))
+
+        tmp.chmod(self.mode)
+        replace(tmp, path)
+
+
+class Transaction(Rollback):
+    """A rollback that is persisted to a journal."""
+
+    def __init__(self, journal: Path = JOURNAL):
+        super().__init__()
+        self.journal = journal
+        self.entries: list[dict[str, Any]] = []
+        self.paths: set[str] = set()
+
+    def snapshot(self, path: Path) -> None:
+        """Journal the file's state before it is changed for the first time."""
+        if str(path) in self.paths:
+            return
+
+        self.paths.add(str(path))
+        state = FileState.read(path)
+        self.record({"file": asdict(state)})
+        self.push(f"restore {path}", state.restore)
+
+    def command(self, description: str, *args: Any) -> None:
+        """Journal a command that undoes a change."""
+        self.record({"description": description, "command": list(map(str, args))})
+        super().command(description, *args)
+
+    def record(self, entry: dict[str, Any]) -> None:
+        """Add an entry to the journal and persist it."""
+        self.entries.append(entry)
+        write(self.journal, self.entries)
+
+    def run(self) -> None:
+        """Undo all changes and discard the journal."""
+        super().run()
+
+        with suppress(FileNotFoundError):
+            self.journal.unlink()
+
+
+def write(journal: Path, entries: list[dict[str, Any]]) -> None:
+    """Atomically write the journal."""
+
+    journal.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    tmp = journal.with_name(f".{journal.name}")
+
+    # The journal may contain private keys.
+    with fdopen(os_open(tmp, O_WRONLY | O_CREAT | O_TRUNC, 0o600), "wb") as file:
+        file.write(compress(dumps(entries).encode(), compresslevel=1))
+
+    replace(tmp, journal)
+
+
+def rollback(journal: Path = JOURNAL) -> None:
+    """Undo the changes of the last setup recorded in the journal."""
+
+    try:
+        entries = loads(decompress(journal.read_bytes()))
+    except FileNotFoundError:
+        raise ProgramError("No setup to roll back.") from None
+
+    transaction = Transaction(journal)
+
+    for entry in entries:
+        if (state := entry.get("file")) is not None:
+            state = FileState(**state)
+            transaction.push(f"restore {state.path}", state.restore)
+        else:
+            action = partial(system, *entry["command"])
+            transaction.push(entry["description"], action)
+
+    LOGGER.info("Rolling back %i changes.", len(entries))
+    transaction.run()
@@ -6,8 +6,6 @@ from re import fullmatch, match
 from subprocess import PIPE, CalledProcessError, check_output
 from typing import Iterable, Iterator
 
-from netifaces import interfaces
-
 from hidslcfg.common import SYSTEMD_NETWORKD
 from hidslcfg.magic_usb import MagicUSBKey
 from hidslcfg.system import systemctl
@@ -18,6 +16,7 @@ __all__ = [
     "MIN_PSK_LEN",
     "configure",
     "disable",
+    "from_magic_file",
     "from_magic_usb_key",
     "list_wifi_interfaces",
     "load_wifi_configs",
@@ -67,13 +66,20 @@ def from_magic_usb_key(*, filename: str = MAGIC_FILE_NAME) -> dict[str, str]:
     """
 
     with MagicUSBKey() as mountpoint:
-        with (mountpoint / filename).open("r", encoding="utf-8") as file:
-            return {key: value for key, value in zip(KEYS, map(str.rstrip, file))}
+        return from_magic_file((mountpoint / filename).read_text(encoding="utf-8"))
+
+
+def from_magic_file(text: str) -> dict[str, str]:
+    """Parse the Wi-Fi configuration file of the magic USB key."""
+
+    return dict(zip(KEYS, map(str.rstrip, text.splitlines())))
 
 
 def list_wifi_interfaces() -> Iterator[str]:
     """Yield available WiFi interfaces."""
 
+    from netifaces import interfaces  # Only needed by the GUI and doctor.
+
     return filter(partial(match, WIFI_INTERFACE_REGEX), interfaces())
 
 
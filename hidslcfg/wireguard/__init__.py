@@ -1,8 +1,34 @@
-"""WireGuard subsystem."""
+"""WireGuard subsystem.
 
-from hidslcfg.wireguard.common import MTU
-from hidslcfg.wireguard.disable import disable
-from hidslcfg.wireguard.setup import create, patch, setup
+The submodules are imported on first access, so that importing e.g.
+hidslcfg.wireguard.common does not pull in the API client and wgtools.
+The setup() and disable() functions are shadowed by their submodules of
+the same name and must be imported from those.
+"""
 
+from importlib import import_module
+from typing import Any
 
-__all__ = ["MTU", "create", "disable", "patch", "setup"]
+
+__all__ = ["MTU", "create", "mtu_type", "patch", "setup_offline", "sync"]
+
+
+SUBMODULES = {
+    "MTU": "common",
+    "create": "setup",
+    "mtu_type": "mtu",
+    "patch": "setup",
+    "setup_offline": "offline",
+    "sync": "offline",
+}
+
+
+def __getattr__(name: str) -> Any:
+    """Import the requested member from its submodule."""
+
+    try:
+        submodule = SUBMODULES[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+
+    return getattr(import_module(f"{__name__}.{submodule}"), name)
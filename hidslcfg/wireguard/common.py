@@ -1,15 +1,17 @@
 """Common constants and functions for the WireGuard subsystem."""
 
 from ipaddress import IPv6Address
+from subprocess import CalledProcessError
 
 from hidslcfg.common import LOGGER, SYSTEMD_NETWORKD, SYSTEMD_NETWORK_DIR
-from hidslcfg.system import systemctl
+from hidslcfg.system import ping, systemctl
 from hidslcfg.system import CalledProcessErrorHandler
 
 
 __all__ = [
     "DEVNAME",
     "DESCRIPTION",
+    "GRACE_TIME",
     "MTU",
     "NETDEV_UNIT_FILE",
     "NETWORK_UNIT_FILE",
@@ -18,11 +20,13 @@ __all__ = [
     "NETDEV_MODE",
     "SERVER",
     "load",
+    "wait_for_server",
 ]
 
 
 DEVNAME = "terminals"
 DESCRIPTION = "Terminal maintenance VPN."
+GRACE_TIME = 3  # seconds
 MTU = 1280  # bytes
 NETDEV_UNIT_FILE = SYSTEMD_NETWORK_DIR / f"{DEVNAME}.netdev"
 NETWORK_UNIT_FILE = SYSTEMD_NETWORK_DIR / f"{DEVNAME}.network"
@@ -39,3 +43,17 @@ def load() -> None:
 
     with CalledProcessErrorHandler(f"Restart of {SYSTEMD_NETWORKD} failed."):
         systemctl("restart", SYSTEMD_NETWORKD)
+
+
+def wait_for_server(grace_time: int = GRACE_TIME) -> bool:
+    """Waits up to the grace time for the WireGuard server to respond."""
+
+    LOGGER.debug("Waiting for %s.", SERVER)
+
+    try:
+        ping(str(SERVER), count=1, deadline=grace_time)
+    except CalledProcessError:
+        LOGGER.warning("WireGuard server not reachable within %i s.", grace_time)
+        return False
+
+    return True
@@ -0,0 +1,124 @@
+"""Path MTU discovery for the WireGuard interface."""
+
+from datetime import datetime
+from json import dumps
+from socket import AF_INET6, getaddrinfo
+from subprocess import CalledProcessError
+
+from hidslcfg.common import LOGGER, STATE_DIR
+from hidslcfg.system import PING, system
+from hidslcfg.trace import traced
+
+from hidslcfg.wireguard.common import MTU
+
+
+__all__ = ["MTU_FILE", "discover", "mtu_type", "path_mtu"]
+
+
+MAX_PATH_MTU = 1500  # bytes, Ethernet
+MIN_PATH_MTU = 576  # bytes, minimum IPv4 datagram size
+MTU_FILE = STATE_DIR / "mtu.json"
+# Outer IP header, UDP header and WireGuard data message header.
+WIREGUARD_OVERHEAD = {False: 20 + 8 + 32, True: 40 + 8 + 32}
+# IP and ICMP echo headers of the probes.
+PROBE_OVERHEAD = {False: 20 + 8, True: 40 + 8}
+
+
+def mtu_type(value: str) -> int | None:
+    """Parses an MTU argument, where None means automatic discovery."""
+
+    return None if value == "auto" else int(value)
+
+
+def split_endpoint(endpoint: str) -> str:
+    """Returns the host of a WireGuard endpoint."""
+
+    host, _, _ = endpoint.rpartition(":")
+    return host.strip("[]")
+
+
+def is_ipv6(host: str) -> bool:
+    """Determines whether the host is reached via IPv6."""
+
+    return getaddrinfo(host, None)[0][0] == AF_INET6
+
+
+def fits(host: str, size: int, ipv6: bool) -> bool:
+    """Determines whether a packet of the given size reaches the host unfragmented."""
+
+    payload = size - PROBE_OVERHEAD[ipv6]
+    family = "-6" if ipv6 else "-4"
+
+    try:
+        system(PING, family, "-M", "do", "-s", payload, "-W", 1, "-c", 1, host)
+    except (CalledProcessError, OSError):
+        return False
+
+    return True
+
+
+@traced("measure path MTU")
+def path_mtu(host: str) -> int | None:
+    """Returns the path MTU to the host or None if it cannot be probed."""
+
+    try:
+        ipv6 = is_ipv6(host)
+    except OSError as error:
+        LOGGER.debug("Cannot resolve %s: %s", host, error)
+        return None
+
+    if not fits(host, low := MIN_PATH_MTU, ipv6):
+        return None
+
+    high = MAX_PATH_MTU + 1
+
+    while high - low > 1:
+        if fits(host, middle := (low + high) // 2, ipv6):
+            low = middle
+        else:
+            high = middle
+
+    return low - WIREGUARD_OVERHEAD[ipv6]
+
+
+def discover(wireguard: dict) -> int:
+    """Returns the largest MTU all peer endpoints can carry.
+
+    Falls back to the default MTU if no endpoint can be probed.
+    The result is recorded for later reference.
+    """
+
+    measured = {}
+
+    for peer in wireguard.get("peers", []):
+        measured[peer["endpoint"]] = path_mtu(split_endpoint(peer["endpoint"]))
+
+    if not (mtus := [mtu for mtu in measured.values() if mtu is not None]):
+        LOGGER.warning("Could not measure the path MTU, using %i.", MTU)
+        mtu = MTU
+    else:
+        mtu = min(mtus)
+        LOGGER.info("Measured WireGuard MTU: %i", mtu)
+
+    if mtu < MTU:
+        # IPv6 within the tunnel requires at least 1280 bytes.
+        LOGGER.warning("MTU %i too small, using %i with fragmentation.", mtu, MTU)
+        mtu = MTU
+
+    try:
+        STATE_DIR.mkdir(mode=0o700, parents=True, exist_ok=True)
+        MTU_FILE.write_text(
+            dumps(
+                {
+                    "measured": measured,
+                    "mtu": mtu,
+                    "timestamp": datetime.now().isoformat(),
+                },
+                indent=2,
+            ),
+            encoding="utf-8",
+        )
+    except OSError as error:
+        LOGGER.warning("Could not record the MTU: %s", error)
+
+    return mtu
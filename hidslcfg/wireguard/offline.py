@@ -0,0 +1,210 @@
+"""Store-and-forward setup for systems without uplink.
+
+The key pair is created and all configuration that does not depend on the
+server's response is applied immediately. The registration is stored as a
+signed record in a root-only queue, which is processed by the sync agent
+once the system is online. The record authenticates with a provisioning
+token, as used for zero-touch provisioning, rather than the technician's
+credentials, so that no password is stored on the system.
+"""
+
+from __future__ import annotations
+from argparse import Namespace
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from hashlib import sha256
+from hmac import compare_digest, new
+from json import dumps, loads
+from os import O_CREAT, O_EXCL, O_WRONLY, fdopen, open as os_open, rename
+from pathlib import Path
+from secrets import token_bytes
+from typing import Any, Iterator
+from uuid import uuid4
+
+from wgtools import keypair
+
+from hidslcfg.api import Client
+from hidslcfg.common import LOGGER, STATE_DIR
+from hidslcfg.configure import APPCMD_HOSTNAME, configure
+from hidslcfg.exceptions import APIError, ProgramError
+from hidslcfg.hosts import set_ip
+from hidslcfg.pacman import set_server
+from hidslcfg.progress import Progress, Step
+from hidslcfg.system import is_ddb_os_system, systemctl
+
+from hidslcfg.wireguard.common import GRACE_TIME, MTU, SERVER
+from hidslcfg.wireguard.setup import configure_, get_model
+
+
+__all__ = ["PendingRegistration", "setup_offline", "sync"]
+
+
+KEY_FILE = STATE_DIR / "queue.key"
+PENDING_DIR = STATE_DIR / "pending"
+SYNC_TIMER = "hidslcfg-sync.timer"
+
+
+@dataclass
+class PendingRegistration:
+    """A registration to be sent to the server.
+
+    This contains the WireGuard private key and the provisioning token
+    and must therefore only be readable by root.
+    """
+
+    token: str
+    private: str
+    json: dict[str, Any]
+    system_id: int | None = None
+    mtu: int | None = MTU
+    created: str = field(default_factory=lambda: datetime.now().isoformat())
+
+    def sign(self, key: bytes) -> dict[str, Any]:
+        """Return the signed record."""
+        record = asdict(self)
+        return {"record": record, "signature": signature(record, key)}
+
+    @classmethod
+    def from_signed(cls, json: dict[str, Any], key: bytes) -> PendingRegistration:
+        """Verify and return a signed record."""
+        record = json["record"]
+
+        if not compare_digest(json["signature"], signature(record, key)):
+            raise ProgramError("Invalid signature of pending registration.")
+
+        return cls(**record)
+
+
+def signature(record: dict[str, Any], key: bytes) -> str:
+    """Return the HMAC of the record."""
+
+    return new(key, dumps(record, sort_keys=True).encode(), sha256).hexdigest()
+
+
+def get_key() -> bytes:
+    """Return the signing key, creating it if necessary."""
+
+    try:
+        return KEY_FILE.read_bytes()
+    except FileNotFoundError:
+        write_private(KEY_FILE, key := token_bytes(32))
+        return key
+
+
+def write_private(path: Path, content: bytes) -> None:
+    """Create a new file only readable by its owner."""
+
+    path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+
+    with fdopen(os_open(path, O_WRONLY | O_CREAT | O_EXCL, 0o600), "wb") as file:
+        file.write(content)
+
+
+def enqueue(registration: PendingRegistration) -> Path:
+    """Store a pending registration."""
+
+    path = PENDING_DIR / f"{datetime.now():%Y%m%d%H%M%S}-{uuid4().hex}.json"
+    write_private(path, dumps(registration.sign(get_key())).encode())
+    return path
+
+
+def update(path: Path, registration: PendingRegistration) -> None:
+    """Atomically replace a pending registration."""
+
+    tmp = path.with_suffix(".tmp")
+    tmp.unlink(missing_ok=True)
+    write_private(tmp, dumps(registration.sign(get_key())).encode())
+    rename(tmp, path)
+
+
+def pending() -> Iterator[tuple[Path, PendingRegistration]]:
+    """Yield the pending registrations in the order of their creation."""
+
+    if not PENDING_DIR.is_dir():
+        return
+
+    key = get_key()
+
+    for path in sorted(PENDING_DIR.glob("*.json")):
+        yield path, PendingRegistration.from_signed(loads(path.read_bytes()), key)
+
+
+def setup_offline(args: Namespace, token: str) -> None:
+    """Queue the setup of a system and apply its local configuration."""
+
+    if args.id is not None and not args.force:
+        raise ProgramError("Refusing to change existing system without --force.")
+
+    LOGGER.debug("Creating public / private key pair.")
+    pubkey, private = keypair()
+    json = {
+        "os": args.operating_system,
+        "model": get_model(args),
+        "sn": args.serial_number,
+        "ddb_os": is_ddb_os_system(),
+        "pubkey": pubkey,
+    }
+
+    if args.id is None:
+        json["group"] = args.group
+
+    path = enqueue(PendingRegistration(token, private, json, args.id, args.mtu))
+    LOGGER.info("Registration queued as %s.", path.name)
+
+    if args.id is None:
+        LOGGER.debug("Updating /etc/hosts.")
+        set_ip(APPCMD_HOSTNAME, SERVER)
+        LOGGER.debug("Updating /etc/pacman.conf.")
+        set_server("homeinfo", SERVER)
+    else:
+        configure(args.id, SERVER)
+
+    systemctl("enable", "--now", SYNC_TIMER)
+
+
+def sync(*, grace_time: int = GRACE_TIME, progress: Progress = Progress()) -> int:
+    """Complete all pending registrations and return the amount completed."""
+
+    completed = 0
+
+    for path, registration in pending():
+        try:
+            with progress.step(Step.API):
+                system = register(registration)
+        except APIError as error:
+            LOGGER.warning("Could not complete %s: %s", path.name, error)
+            break
+
+        LOGGER.info("Completed registration of system #%i.", system["id"])
+
+        if registration.system_id is None:
+            # Patch the system instead of adding another one on retries.
+            registration.system_id = system["id"]
+            registration.json.pop("group", None)
+            update(path, registration)
+
+        configure_(
+            system,
+            registration.private,
+            mtu=registration.mtu,
+            grace_time=grace_time,
+            progress=progress,
+        )
+        path.unlink()
+        completed += 1
+    else:
+        systemctl("disable", SYNC_TIMER)
+
+    return completed
+
+
+def register(registration: PendingRegistration) -> dict[str, Any]:
+    """Send the registration to the server."""
+
+    client = Client()
+    client.authorize(registration.token)
+
+    if registration.system_id is None:
+        return client.add_system(**registration.json)
+
+    return client.patch_system(**registration.json, system=registration.system_id)
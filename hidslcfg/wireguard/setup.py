@@ -1,20 +1,27 @@
 """Configure system for WireGuard."""
 
 from argparse import Namespace
-from typing import Iterator
+from io import StringIO
+from pathlib import Path
+from typing import Iterable, Iterator
 
 from wgtools import keypair
 
 from hidslcfg.api import Client
-from hidslcfg.common import LOGGER
+from hidslcfg.common import LOGGER, ROOT, SYSTEMD_NETWORKD, rooted
 from hidslcfg.configure import configure
 from hidslcfg.exceptions import ProgramError
-from hidslcfg.system import chown
+from hidslcfg.progress import Progress, Step
+from hidslcfg.reconcile import File
+from hidslcfg.rollback import Rollback
 from hidslcfg.system import is_ddb_os_system
 from hidslcfg.system import SystemdUnit
+from hidslcfg.trace import traced
+from hidslcfg.transaction import Transaction
 
 from hidslcfg.wireguard.common import DEVNAME
 from hidslcfg.wireguard.common import DESCRIPTION
+from hidslcfg.wireguard.common import GRACE_TIME
 from hidslcfg.wireguard.common import MTU
 from hidslcfg.wireguard.common import NETDEV_UNIT_FILE
 from hidslcfg.wireguard.common import NETWORK_UNIT_FILE
@@ -23,31 +30,75 @@ from hidslcfg.wireguard.common import NETDEV_GROUP
 from hidslcfg.wireguard.common import NETDEV_MODE
 from hidslcfg.wireguard.common import SERVER
 from hidslcfg.wireguard.common import load
+from hidslcfg.wireguard.common import wait_for_server
+from hidslcfg.wireguard.mtu import discover
 
 
 __all__ = ["create", "patch", "setup"]
 
 
-def create(client: Client, mtu: int = MTU, **json) -> int:
+@traced("create WireGuard system")
+def create(
+    client: Client,
+    mtu: int | None = MTU,
+    *,
+    grace_time: int = GRACE_TIME,
+    progress: Progress = Progress(),
+    root: Path = ROOT,
+    **json,
+) -> int:
     """Creates a new WireGuard system."""
 
-    LOGGER.debug("Creating public / private key pair.")
-    pubkey, private = keypair()
-    LOGGER.info("Creating new WireGuard system.")
-    system = client.add_system(**json, pubkey=pubkey)
-    LOGGER.info("New system ID: %i", system_id := system["id"])
-    configure_(system, private, mtu=mtu)
+    with progress.step(Step.KEYPAIR):
+        LOGGER.debug("Creating public / private key pair.")
+        pubkey, private = keypair()
+
+    with progress.step(Step.API):
+        LOGGER.info("Creating new WireGuard system.")
+        system = client.add_system(**json, pubkey=pubkey)
+
+    system_id = system["id"]
+    LOGGER.info("New system ID: %i", system_id, extra={"SYSTEM_ID": system_id})
+    configure_(
+        system,
+        private,
+        mtu=mtu,
+        grace_time=grace_time,
+        progress=progress,
+        root=root,
+    )
     return system_id
 
 
-def patch(client: Client, system_id: int, mtu: int = MTU, **json) -> int:
+@traced("patch WireGuard system")
+def patch(
+    client: Client,
+    system_id: int,
+    mtu: int | None = MTU,
+    *,
+    grace_time: int = GRACE_TIME,
+    progress: Progress = Progress(),
+    root: Path = ROOT,
+    **json,
+) -> int:
     """Patches an existing WireGuard system."""
 
-    LOGGER.debug("Creating public / private key pair.")
-    pubkey, private = keypair()
-    LOGGER.info("Changing existing WireGuard system #%i.", system_id)
-    system = client.patch_system(**json, system=system_id, pubkey=pubkey)
-    configure_(system, private, mtu=mtu)
+    with progress.step(Step.KEYPAIR):
+        LOGGER.debug("Creating public / private key pair.")
+        pubkey, private = keypair()
+
+    with progress.step(Step.API):
+        LOGGER.info("Changing existing WireGuard system #%i.", system_id)
+        system = client.patch_system(**json, system=system_id, pubkey=pubkey)
+
+    configure_(
+        system,
+        private,
+        mtu=mtu,
+        grace_time=grace_time,
+        progress=progress,
+        root=root,
+    )
     return system_id
 
 
@@ -58,11 +109,13 @@ def setup(client: Client, args: Namespace) -> int:
         return create(
             client,
             mtu=args.mtu,
+            grace_time=args.grace_time,
+            root=args.root,
             os=args.operating_system,
             model=get_model(args),
             sn=args.serial_number,
             group=args.group,
-            ddb_os=is_ddb_os_system(),
+            ddb_os=is_ddb_os_system(root=args.root),
         )
 
     if args.force:
@@ -70,10 +123,12 @@ def setup(client: Client, args: Namespace) -> int:
             client,
             args.id,
             mtu=args.mtu,
+            grace_time=args.grace_time,
+            root=args.root,
             os=args.operating_system,
             model=get_model(args),
             sn=args.serial_number,
-            ddb_os=is_ddb_os_system(),
+            ddb_os=is_ddb_os_system(root=args.root),
         )
 
     raise ProgramError("Refusing to change existing system without --force.")
@@ -85,19 +140,20 @@ def get_model(args: Namespace) -> str:
     if args.model:
         return args.model
 
-    if args.standard24:
+    # Only the CLI has the model flags.
+    if getattr(args, "standard24", False):
         return 'Standard 24"'
 
-    if args.standard32:
+    if getattr(args, "standard32", False):
         return 'Standard 32"'
 
-    if args.phoenix:
+    if getattr(args, "phoenix", False):
         return "Phönix"
 
-    if args.neptun:
+    if getattr(args, "neptun", False):
         return "Neptun"
 
-    raise ValueError("No model specified.")
+    raise ProgramError("No model specified or detected.")
 
 
 def create_netdev_unit(
@@ -136,17 +192,6 @@ def create_netdev_unit(
         yield unit
 
 
-def write_netdev(wireguard: dict, private: str, mtu: int = MTU) -> None:
-    """Creates a network device."""
-
-    with NETDEV_UNIT_FILE.open("w", encoding="utf-8") as netdev_unit_file:
-        for part in create_netdev_unit(wireguard, private, mtu=mtu):
-            part.write(netdev_unit_file)
-
-    chown(NETDEV_UNIT_FILE, NETDEV_OWNER, NETDEV_GROUP)
-    NETDEV_UNIT_FILE.chmod(NETDEV_MODE)
-
-
 def create_network_unit(wireguard: dict) -> Iterator[SystemdUnit]:
     """Yields WireGuard network unit file parts."""
 
@@ -175,29 +220,91 @@ def create_network_unit(wireguard: dict) -> Iterator[SystemdUnit]:
             yield unit
 
 
-def write_network(wireguard: dict) -> None:
-    """Creates a WireGuard network unit file."""
+def render(parts: Iterable[SystemdUnit]) -> str:
+    """Renders the unit file parts."""
 
-    with NETWORK_UNIT_FILE.open("w", encoding="utf-8") as network_unit_file:
-        for part in create_network_unit(wireguard):
-            part.write(network_unit_file)
+    text = StringIO()
 
+    for part in parts:
+        part.write(text)
 
-def write_units(wireguard: dict, private: str, mtu: int = MTU) -> None:
-    """Writes the WireGuard systemd units."""
+    return text.getvalue()
+
+
+def unit_files(
+    wireguard: dict, private: str, mtu: int = MTU, *, root: Path = ROOT
+) -> Iterator[File]:
+    """Yields the desired WireGuard systemd unit files."""
 
     if pubkey := wireguard.get("pubkey"):
         LOGGER.warning("WireGuard already configured for pubkey %s.", pubkey)
 
-    LOGGER.debug("Installing WireGuard configuration.")
-    write_netdev(wireguard, private, mtu=mtu)
-    write_network(wireguard)
+    # Services of a system mounted elsewhere must not be restarted.
+    units = frozenset({SYSTEMD_NETWORKD} if root == ROOT else ())
+    yield File(
+        Step.UNITS,
+        rooted(NETDEV_UNIT_FILE, root),
+        render(create_netdev_unit(wireguard, private, mtu=mtu)),
+        owner=NETDEV_OWNER,
+        group=NETDEV_GROUP,
+        mode=NETDEV_MODE,
+        units=units,
+        root=root,
+    )
+    yield File(
+        Step.UNITS,
+        rooted(NETWORK_UNIT_FILE, root),
+        render(create_network_unit(wireguard)),
+        units=units,
+        root=root,
+    )
+
+
+def configure_(
+    system: dict,
+    private: str,
+    mtu: int | None = MTU,
+    *,
+    grace_time: int = GRACE_TIME,
+    progress: Progress = Progress(),
+    root: Path = ROOT,
+) -> None:
+    """Configures the system for WireGuard.
+
+    If no MTU is given, it is derived from the path MTU to the peers.
+    Rolls back all applied changes on errors or cancellation.
+    The changes are journaled to be undone later via hidslreset --rollback.
+    If a root directory is given, the system mounted there is configured
+    and neither journaled nor brought online.
+    """
+
+    rollback = Transaction() if root == ROOT else Rollback()
+
+    try:
+        if mtu is None:
+            # The network of a mounted system is unknown.
+            mtu = discover(system["wireguard"]) if root == ROOT else MTU
+
+        restarts = configure(
+            system["id"],
+            SERVER,
+            progress=progress,
+            rollback=rollback,
+            resources=unit_files(system["wireguard"], private, mtu=mtu, root=root),
+            root=root,
+        )
 
+        if root != ROOT:
+            return
 
-def configure_(system: dict, private: str, mtu: int = MTU) -> None:
-    """Configures the system for WireGuard."""
+        with progress.step(Step.NETWORKD):
+            if SYSTEMD_NETWORKD in restarts:
+                load()
+            else:
+                LOGGER.debug("Units unchanged, not restarting %s.", SYSTEMD_NETWORKD)
 
-    configure(system["id"], SERVER)
-    write_units(system["wireguard"], private, mtu=mtu)
-    LOGGER.debug("Disabling OpenVPN.")
-    load()
+        with progress.step(Step.READINESS):
+            wait_for_server(grace_time)
+    except BaseException:
+        rollback.run()
+        raise
@@ -0,0 +1,230 @@
+"""Zero-touch provisioning from the magic USB key.
+
+The key's profile.json looks like this, where all keys except for "token"
+and "model" are optional and "systems" overrides settings per serial number:
+
+    {
+        "token": "<provisioning token>",
+        "model": "Standard 24\\"",
+        "group": 1,
+        "operating_system": "Arch Linux",
+        "mtu": "auto",
+        "wifi": [{"ssid": "<SSID>", "psk": "<PSK>", "interface": "wlp1s0"}],
+        "reboot": true,
+        "prefetch": false,
+        "systems": {"<serial number>": {"id": 1234, "group": 2}}
+    }
+
+The log of each run is written to the key's logs directory.
+"""
+
+from __future__ import annotations
+from argparse import Namespace
+from contextlib import contextmanager
+from datetime import datetime
+from json import dumps, loads
+from logging import DEBUG, FileHandler, Formatter
+from pathlib import Path
+from subprocess import CalledProcessError
+from time import sleep
+from typing import Any, Iterator
+
+from hidslcfg.api import Client
+from hidslcfg.common import LOG_FORMAT, LOGGER, ROOT
+from hidslcfg.exceptions import APIError, ProgramError
+from hidslcfg.journal import attached
+from hidslcfg.magic_usb import MagicUSBKey
+from hidslcfg.prefetch import schedule
+from hidslcfg.system import get_hostname, get_serial_number
+from hidslcfg.wifi import configure, list_wifi_interfaces
+from hidslcfg.wireguard.mtu import mtu_type
+from hidslcfg.wireguard.setup import setup
+
+
+__all__ = ["PROFILE", "is_configured", "load_profile", "provision"]
+
+
+LOG_DIR = "logs"
+PROFILE = "profile.json"
+READ_WRITE = "rw,nosuid,nodev,noexec"
+RETRIES = 10
+RETRY_INTERVAL = 6  # seconds
+
+
+def is_configured() -> bool:
+    """Determines whether the system has a system ID as host name."""
+
+    try:
+        int(get_hostname())
+    except (FileNotFoundError, ValueError):
+        return False
+
+    return True
+
+
+def load_profile(text: str, serial_number: str | None) -> dict[str, Any]:
+    """Loads the profile and applies the overrides of the serial number."""
+
+    profile = loads(text)
+    overrides = profile.pop("systems", {})
+
+    if serial_number is not None:
+        profile.update(overrides.get(serial_number, {}))
+
+    for key in ("token", "model"):
+        if not profile.get(key):
+            raise ProgramError(f"Missing {key} in provisioning profile.")
+
+    return profile
+
+
+def setup_args(profile: dict[str, Any], serial_number: str | None) -> Namespace:
+    """Returns the setup arguments of the profile."""
+
+    return Namespace(
+        id=profile.get("id"),
+        force=True,
+        model=profile["model"],
+        serial_number=serial_number,
+        group=profile.get("group", 1),
+        operating_system=profile.get("operating_system", "Arch Linux"),
+        mtu=mtu_type(str(profile.get("mtu", "auto"))),
+        grace_time=profile.get("grace_time", 3),
+        root=ROOT,
+    )
+
+
+def configure_wifi(networks: list[dict[str, str]]) -> None:
+    """Configures the Wi-Fi networks of the profile.
+
+    Networks without an interface are assigned the remaining interfaces
+    in order.
+    """
+
+    interfaces = list(list_wifi_interfaces())
+    explicit = {network["interface"] for network in networks if "interface" in network}
+    defaults = iter([name for name in interfaces if name not in explicit])
+
+    for network in networks:
+        if (interface := network.get("interface")) is None:
+            if (interface := next(defaults, None)) is None:
+                LOGGER.warning("No Wi-Fi interface left for %s.", network["ssid"])
+                continue
+        elif interface not in interfaces:
+            LOGGER.warning("Wi-Fi interface %s not present.", interface)
+
+        LOGGER.info("Configuring Wi-Fi %s on %s.", network["ssid"], interface)
+        configure(interface, network["ssid"], network["psk"])
+
+
+def wait_for_api(client: Client) -> None:
+    """Waits until the API accepts connections while the network comes up."""
+
+    for attempt in range(1, RETRIES + 1):
+        if client.reachable():
+            return
+
+        LOGGER.warning("API not reachable, attempt %i of %i.", attempt, RETRIES)
+        sleep(RETRY_INTERVAL)
+
+    raise ProgramError("The API is not reachable.")
+
+
+def register(client: Client, args: Namespace) -> int:
+    """Runs the setup once the API is reachable.
+
+    The setup itself is not retried, since a failed request may still
+    have registered the system.
+    """
+
+    wait_for_api(client)
+
+    try:
+        return setup(client, args)
+    except APIError as error:
+        if error.status is None and args.id is None:
+            LOGGER.warning("The system may have been registered nonetheless.")
+
+        raise
+
+
+@contextmanager
+def log_to(directory: Path, name: str) -> Iterator[Path]:
+    """Additionally writes the log to a file in the directory."""
+
+    directory.mkdir(exist_ok=True)
+    path = directory / f"{name}-{datetime.now():%Y%m%d-%H%M%S}.log"
+    handler = FileHandler(path, encoding="utf-8")
+    handler.setFormatter(Formatter(f"%(asctime)s {LOG_FORMAT}"))
+    handler.setLevel(DEBUG)
+
+    try:
+        with attached(handler):
+            yield path
+    finally:
+        handler.close()
+
+
+def provision() -> bool:
+    """Provisions the system from the magic USB key.
+
+    Returns whether the system shall be rebooted.
+    """
+
+    serial_number = get_serial_number()
+
+    with MagicUSBKey(options=READ_WRITE) as mountpoint:
+        if not (file := mountpoint / PROFILE).exists():
+            raise ProgramError("No provisioning profile on the USB key.")
+
+        with log_to(mountpoint / LOG_DIR, serial_number or "unknown") as log:
+            LOGGER.info("Provisioning system with serial number %s.", serial_number)
+
+            try:
+                profile = load_profile(file.read_text(encoding="utf-8"), serial_number)
+                configure_wifi(profile.get("wifi", []))
+
+                with Client() as client:
+                    client.authorize(profile["token"])
+                    system_id = register(client, setup_args(profile, serial_number))
+            except Exception:
+                LOGGER.exception("Provisioning failed.")
+                write_result(log, serial_number, None)
+                raise
+
+            LOGGER.info("Provisioned system #%i.", system_id)
+            write_result(log, serial_number, system_id)
+
+    # Scheduled once the key is unmounted, so that it can be removed.
+    if profile.get("prefetch", False):
+        prefetch_updates()
+
+    return profile.get("reboot", True)
+
+
+def prefetch_updates() -> None:
+    """Schedules the download of pending package updates, ignoring failures."""
+
+    try:
+        schedule()
+    except (CalledProcessError, OSError) as error:
+        LOGGER.warning("Could not schedule prefetching updates: %s", error)
+    else:
+        LOGGER.info("Prefetching updates in the background.")
+
+
+def write_result(log: Path, serial_number: str | None, system_id: int | None) -> None:
+    """Appends the result to the key's result list."""
+
+    with (log.parent / "results.jsonl").open("a", encoding="utf-8") as file:
+        file.write(
+            dumps(
+                {
+                    "serial_number": serial_number,
+                    "system": system_id,
+                    "log": log.name,
+                    "timestamp": datetime.now().isoformat(),
+                }
+            )
+            + "\n"
+        )
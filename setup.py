@@ -15,6 +15,7 @@ setup(
     requires=["requests", "netifaces", "pygobject", "pygtk", "wgtools"],
     packages=[
         "hidslcfg",
+        "hidslcfg.benchmarks",
         "hidslcfg.cli",
         "hidslcfg.gui",
         "hidslcfg.gui.windows",
@@ -25,8 +26,19 @@ setup(
         "console_scripts": [
             "hidslcfg = hidslcfg.cli.hidslcfg:run",
             "hidslreset = hidslcfg.cli.hidslreset:run",
+            "hidslcfg-doctor = hidslcfg.cli.hidsldoctor:run",
+            "hidslcfg-provision = hidslcfg.cli.hidslprovision:run",
+            "hidslcfg-ztp = hidslcfg.cli.hidslztp:run",
+            "hidslcfg-mirrors = hidslcfg.cli.hidslmirrors:run",
+            "hidslcfg-prefetch = hidslcfg.cli.hidslprefetch:run",
+            "hidslcfg-sync = hidslcfg.cli.hidslsync:run",
             "hidslcfg-gui = hidslcfg.gui.application:run",
-            "hidslcfg-create-index = hidslcfg.configure:create_ddbos_start",
+            "hidslcfg-create-index = hidslcfg.startpage:create_ddbos_start",
+            "hidslcfg-benchmark-api = hidslcfg.benchmarks.api:run",
+            "hidslcfg-benchmark-files = hidslcfg.benchmarks.files:run",
+            "hidslcfg-benchmark-gui = hidslcfg.benchmarks.gui:run",
+            "hidslcfg-benchmark-imports = hidslcfg.benchmarks.importtime:run",
+            "hidslcfg-mock-server = hidslcfg.benchmarks.mockserver:run",
         ],
     },
     description="HOMEINFO Digital Signage Linux configurator.",